@@ -0,0 +1,368 @@
+# Benchmarks for the goal model, stores and window at 100 to 100k goals.
+# Synthetic goals files are written to a temporary directory, so your own
+# goals_data.json and settings.json are never touched.
+#
+#   python bench_goals.py                          # all headless benchmarks
+#   python bench_goals.py --sizes 100,1000 --only journal
+#   python bench_goals.py --gui                    # also time the window (needs a display)
+#   xvfb-run python bench_goals.py --gui           # ...or a virtual X display
+#   python bench_goals.py > bench_output.txt
+#   python bench_goals.py --compare bench_output.txt
+#
+# Each benchmark is timed --repeat times with fresh setup, then run once more
+# under tracemalloc for its peak allocation. The JSON report goes to stdout
+# (or --output); progress goes to stderr. With --compare, the exit status is
+# 1 when any benchmark is slower than the baseline by more than --threshold.
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+from goals_core import (
+    Goal, GoalIndex, GoalJournal, NameSearch, SqliteGoalStore, calculate_time_elapsed, elapsed_days_batch,
+    format_elapsed, read_goal_file, write_goal_file, write_settings,
+)
+import goals_core
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+DEFAULT_REPEAT = 5
+GUI_MAX_FULL_LIST = 1000
+REGRESSION_THRESHOLD = 0.2
+SEED = 1234
+NAME_WORDS = [
+    "quit", "caffeine", "sugar", "smoking", "vaping", "soda", "run", "daily", "walk", "read", "no", "late",
+    "snacks", "doomscrolling", "drinking", "gaming", "meditate", "stretch", "journal", "early", "bed", "coffee",
+]
+
+BENCHMARKS = []
+
+def benchmark(name, gui=False):
+    def register(setup):
+        BENCHMARKS.append((name, setup, gui))
+        return setup
+    return register
+
+def make_goals(size, seed=SEED):
+    rng = random.Random(seed)
+    today = date.today().toordinal()
+    goals = []
+    for i in range(size):
+        name = f"{' '.join(rng.sample(NAME_WORDS, rng.randint(1, 3))).capitalize()} #{i}"
+        ordinal = today - rng.randint(0, 20 * 365)
+        goal = Goal(name, ordinal)
+        if rng.random() < 0.1:
+            for _ in range(rng.randint(1, 5)):
+                goal.record_relapse(min(today, goal.ordinal + rng.randint(1, 200)))
+        goals.append(goal)
+    return goals
+
+def write_snapshot(path, goals):
+    with open(path, 'w') as f:
+        json.dump([goal.to_dict() for goal in goals], f, indent=4)
+    return path
+
+
+@benchmark("journal.load")
+def bench_journal_load(workdir, goals):
+    journal = GoalJournal(
+        write_snapshot(os.path.join(workdir, "goals_data.json"), goals), os.path.join(workdir, "goals_data.journal")
+    )
+    return journal.load
+
+@benchmark("journal.iter_load.first_batch")
+def bench_journal_first_batch(workdir, goals):
+    journal = GoalJournal(
+        write_snapshot(os.path.join(workdir, "goals_data.json"), goals), os.path.join(workdir, "goals_data.journal")
+    )
+    return lambda: next(journal.iter_load())
+
+@benchmark("journal.append")
+def bench_journal_append(workdir, goals):
+    journal = GoalJournal(os.path.join(workdir, "goals_data.json"), os.path.join(workdir, "goals_data.journal"))
+    change = {"op": "add", "name": "Benchmark goal", "date": date.today().isoformat()}
+    return lambda: journal.append(change)
+
+@benchmark("journal.compact")
+def bench_journal_compact(workdir, goals):
+    journal = GoalJournal(os.path.join(workdir, "goals_data.json"), os.path.join(workdir, "goals_data.journal"))
+    return lambda: journal.compact(goals)
+
+@benchmark("sqlite.import")
+def bench_sqlite_import(workdir, goals):
+    data_file = write_snapshot(os.path.join(workdir, "goals_data.json"), goals)
+    store = SqliteGoalStore(
+        os.path.join(workdir, f"import-{time.perf_counter_ns()}.sqlite3"), data_file,
+        os.path.join(workdir, "goals_data.journal"),
+    )
+    return lambda: (store.load(), store.close())
+
+@benchmark("sqlite.load")
+def bench_sqlite_load(workdir, goals):
+    store = SqliteGoalStore(
+        os.path.join(workdir, "goals.sqlite3"), os.path.join(workdir, "missing.json"),
+        os.path.join(workdir, "missing.journal"),
+    )
+    store.save(goals)
+    return lambda: store.load()
+
+@benchmark("sqlite.save_change")
+def bench_sqlite_save_change(workdir, goals):
+    store = SqliteGoalStore(
+        os.path.join(workdir, "goals.sqlite3"), os.path.join(workdir, "missing.json"),
+        os.path.join(workdir, "missing.journal"),
+    )
+    store.save(goals)
+    goal = goals[len(goals) // 2]
+    change = {"op": "edit", "old": goal.name, **goal.to_dict()}
+    return lambda: store.save(goals, change)
+
+@benchmark("index.build")
+def bench_index_build(workdir, goals):
+    shuffled = random.Random(SEED).sample(goals, len(goals))
+    return lambda: GoalIndex(shuffled)
+
+@benchmark("index.add_one_by_one")
+def bench_index_add(workdir, goals):
+    shuffled = [Goal(goal.name, goal.ordinal) for goal in random.Random(SEED).sample(goals, len(goals))]
+    def add_all():
+        index = GoalIndex()
+        for goal in shuffled:
+            index.add(goal)
+    return add_all
+
+@benchmark("elapsed.calculate_time_elapsed")
+def bench_calculate_time_elapsed(workdir, goals):
+    ordinals = [goal.ordinal for goal in goals]
+    def calculate():
+        for ordinal in ordinals:
+            calculate_time_elapsed(ordinal)
+    return calculate
+
+@benchmark("elapsed.batch")
+def bench_elapsed_batch(workdir, goals):
+    ordinals = GoalIndex(goals).ordinals()
+    def calculate():
+        totals, _, _ = elapsed_days_batch(ordinals)
+        format_elapsed.cache_clear()
+        for total_days in totals:
+            format_elapsed(total_days)
+    return calculate
+
+@benchmark("streak_stats")
+def bench_streak_stats(workdir, goals):
+    today = date.today().toordinal()
+    def stats():
+        for goal in goals:
+            goal.streak_stats(today)
+    return stats
+
+@benchmark("search.build")
+def bench_search_build(workdir, goals):
+    return lambda: NameSearch(goals).build()
+
+@benchmark("search.query")
+def bench_search_query(workdir, goals):
+    search = NameSearch(goals)
+    search.build()
+    queries = ["q", "qu", "qui", "quit", "quit c", "quit caf"]
+    return lambda: [search.search(query) for query in queries]
+
+@benchmark("file.export_csv")
+def bench_export_csv(workdir, goals):
+    return lambda: write_goal_file(os.path.join(workdir, "export.csv"), goals)
+
+@benchmark("file.import_csv")
+def bench_import_csv(workdir, goals):
+    path = os.path.join(workdir, "import.csv")
+    write_goal_file(path, goals)
+    existing = GoalIndex()
+    return lambda: read_goal_file(path, existing)
+
+
+# Window benchmarks run in workdir (the app uses relative file names) and
+# pump the Tk loop until streaming load has finished.
+def open_app(workdir, goals, list_mode):
+    import goals_app
+    write_snapshot(os.path.join(workdir, goals_core.DATA_FILE), goals)
+    write_settings({"font_size": goals_core.DEFAULT_FONT_SIZE, "list_mode": list_mode, "storage": "json"},
+                   os.path.join(workdir, goals_core.SETTINGS_FILE))
+    app = goals_app.GoalsApp()
+    while app.loading:
+        app.update()
+    app.update_idletasks()
+    return app
+
+def close_app(app):
+    app._on_close()
+
+def gui_benchmark(name, list_mode):
+    def register(run):
+        @benchmark(f"gui.{list_mode}.{name}", gui=True)
+        def setup(workdir, goals):
+            if list_mode == "full" and len(goals) > GUI_MAX_FULL_LIST:
+                return None
+            return run(workdir, goals, list_mode)
+        return run
+    return register
+
+def bench_gui_startup(workdir, goals, list_mode):
+    return lambda: close_app(open_app(workdir, goals, list_mode))
+
+def bench_gui_update_display(workdir, goals, list_mode):
+    # cleanup closes the window once the run is timed; each run gets a fresh one.
+    app = open_app(workdir, goals, list_mode)
+    def refresh():
+        app.update_display()
+        app.update_idletasks()
+    refresh.cleanup = lambda: close_app(app)
+    return refresh
+
+def bench_gui_font_change(workdir, goals, list_mode):
+    app = open_app(workdir, goals, list_mode)
+    sizes = iter([14, 18] * 1000)
+    def change_font():
+        app.current_font_size = next(sizes)
+        app._apply_global_font_settings()
+        app.update()
+    change_font.cleanup = lambda: close_app(app)
+    return change_font
+
+for _mode in ("virtual", "full"):
+    gui_benchmark("startup", _mode)(bench_gui_startup)
+    gui_benchmark("update_display", _mode)(bench_gui_update_display)
+    gui_benchmark("font_change", _mode)(bench_gui_font_change)
+
+
+def time_once(setup, workdir, goals):
+    run = setup(workdir, goals)
+    if run is None:
+        return None
+    try:
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
+    finally:
+        cleanup = getattr(run, "cleanup", None)
+        if cleanup is not None:
+            cleanup()
+
+def peak_memory(setup, workdir, goals):
+    run = setup(workdir, goals)
+    try:
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        return peak
+    finally:
+        tracemalloc.stop()
+        cleanup = getattr(run, "cleanup", None)
+        if cleanup is not None:
+            cleanup()
+
+def run_benchmarks(sizes, repeat, only=None, gui=False):
+    results = []
+    for size in sizes:
+        goals = make_goals(size)
+        for name, setup, needs_display in BENCHMARKS:
+            if needs_display and not gui:
+                continue
+            if only and not any(part in name for part in only):
+                continue
+            with tempfile.TemporaryDirectory(prefix="goals-bench-") as workdir:
+                # Stores fall back to paths relative to the working directory.
+                previous_dir = os.getcwd()
+                os.chdir(workdir)
+                try:
+                    runs = [time_once(setup, workdir, goals) for _ in range(repeat)]
+                    if None in runs:
+                        continue
+                    peak = peak_memory(setup, workdir, goals)
+                finally:
+                    os.chdir(previous_dir)
+            result = {
+                "name": name,
+                "size": size,
+                "median_s": statistics.median(runs),
+                "min_s": min(runs),
+                "runs_s": runs,
+                "peak_kib": round(peak / 1024, 1),
+            }
+            results.append(result)
+            print(f"{name:<36} {size:>7}  median {result['median_s'] * 1000:10.3f} ms  "
+                  f"peak {result['peak_kib']:>10.1f} KiB", file=sys.stderr)
+    return results
+
+def compare(results, baseline_file, threshold):
+    with open(baseline_file, 'r') as f:
+        baseline = {(entry["name"], entry["size"]): entry for entry in json.load(f)["results"]}
+    regressions = []
+    for entry in results:
+        before = baseline.get((entry["name"], entry["size"]))
+        if before is None or not before["median_s"]:
+            continue
+        ratio = entry["median_s"] / before["median_s"]
+        entry["baseline_median_s"] = before["median_s"]
+        entry["ratio"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append(entry)
+            print(f"Slower: {entry['name']} at {entry['size']} goals is {ratio:.2f}x the baseline", file=sys.stderr)
+    return regressions
+
+def parse_sizes(value):
+    try:
+        return [int(size) for size in value.split(",") if size]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sizes '{value}' (expected e.g. 100,1000)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the goals model, stores and window at scale.")
+    parser.add_argument("--sizes", type=parse_sizes, default=list(DEFAULT_SIZES), help="comma-separated goal counts")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per benchmark")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--gui", action="store_true", help="also time the window (needs DISPLAY, e.g. under xvfb-run)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON report from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown ratio over baseline reported as a regression (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    gui = args.gui
+    if gui and not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        print("No DISPLAY; skipping window benchmarks (try xvfb-run).", file=sys.stderr)
+        gui = False
+
+    # The stores and window print progress; keep stdout for the report.
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_benchmarks(args.sizes, max(1, args.repeat), args.only, gui)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": goals_core._numpy() is not None,
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "gui": gui,
+        },
+        "results": results,
+    }
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,79 +1,198 @@
 # Required packages:
 # pip install customtkinter
 # pip install tkcalendar
+# Optional (vectorized elapsed-time batches):
+# pip install numpy
 
 import customtkinter as ctk
-import json
-import os
-from datetime import date, datetime
-import random
+from datetime import date, datetime, timedelta
+import queue
+import sys
+import threading
+import time
 from tkcalendar import DateEntry
+import tkinter.filedialog as filedialog
+import tkinter.font as tkfont
 import tkinter.messagebox as messagebox
 
-# MAX_GOALS = 10
-DATA_FILE = "goals_data.json"
-SETTINGS_FILE = "settings.json"
-
-ENCOURAGING_WORDS = [
-    "You've got this!", "Keep going strong!", "Amazing progress!", "One day at a time!",
-    "You're doing great!", "Stay focused!", "Incredible work!", "Persistence pays off!",
-    "Keep pushing forward!", "Celebrate this milestone!", "Look how far you've come!",
-    "Keep up the momentum!", "Fantastic effort!", "You're inspiring!",
-    "Badass milestone!", "Kick that habit's ass!", "QUIET! Silence the weakness!",
-    "No mercy on cravings!", "Fear does not exist in this dojo!", "Defeat does not exist!",
-    "Get your head out of your ass and keep fighting!", "Stop being a pussy, you got this!",
-    "Man up and crush this!", "You're becoming a badass!", "Strike hard against temptation!",
-    "Don't let weakness sweep the leg!", "Finish it! Stay strong!",
-    "This shit ain't easy, but you're doing it!", "Awesome!", "Be a badass today!", "No fear!",
-]
+from goals_core import (
+    DEFAULT_FONT_SIZE, DIAGNOSTICS_FILE, DEFAULT_LIST_MODE, DEFAULT_STORAGE_BACKEND, MAX_FONT_SIZE, MIN_FONT_SIZE,
+    CallStats, Goal, GoalIndex, NameSearch, PersistenceWorker, calculate_time_elapsed, create_goal_store, describe_elapsed,
+    diagnostics_requested, elapsed_days_batch, format_display_date, get_random_encouragement, read_goal_file,
+    read_settings, write_goal_file,
+)
 
 STATUS_CLEAR_DELAY_MS = 5000
-DEFAULT_FONT_SIZE = 16
-MIN_FONT_SIZE = 12
-MAX_FONT_SIZE = 24
 FONT_SIZE_INCREMENT = 2
 AVAILABLE_FONT_SIZES = [str(s) for s in range(MIN_FONT_SIZE, MAX_FONT_SIZE + 1, FONT_SIZE_INCREMENT)]
 DATE_ENTRY_PATTERN = 'dd-mm-y'
-DISPLAY_DATE_FORMAT = "%d %b %Y"
 WINDOW_RESIZE_PADDING_WIDTH = 60
 WINDOW_RESIZE_PADDING_HEIGHT = 60
+VIRTUAL_LIST_THRESHOLD = 200
+VIRTUAL_ROW_PADDING = 7
+VIRTUAL_WHEEL_ROWS = 3
+MIDNIGHT_REFRESH_SLACK_MS = 500
+LOAD_POLL_MS = 30
+DIAGNOSTICS_REFRESH_MS = 1000
+INSTRUMENTED_METHODS = (
+    "load_goals", "save_goals", "update_display", "_apply_global_font_settings", "_adjust_window_size",
+)
+GOAL_FILE_TYPES = [("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl *.ndjson"), ("All files", "*.*")]
 
-def calculate_time_elapsed(start_date_str):
-    try:
-        start_date = date.fromisoformat(start_date_str)
-        today = date.today()
-        delta = today - start_date
-        total_days = delta.days
-
-        if total_days < 0:
-            return f"Date {start_date_str} is in the future.", total_days
-
-        years = total_days // 365
-        remaining_days = total_days % 365
-        days = remaining_days
-
-        parts = []
-        if years > 0:
-            parts.append(f"{years} year{'s' if years > 1 else ''}")
-        if days > 0 or total_days == 0:
-             parts.append(f"{days} day{'s' if days != 1 else ''}")
-
-        if total_days == 0:
-             return "Today is the day!", total_days
-        elif not parts:
-             return f"{total_days} day{'s' if total_days != 1 else ''} ago", total_days
+# Keeps a fixed pool of row widgets sized to the viewport and rebinds them to
+# whichever goals are scrolled into view, so widget count stays flat.
+class VirtualGoalList(ctk.CTkFrame):
+    def __init__(self, master, label_text, label_font, info_font, button_font,
+                 text_for, on_edit, on_delete, **kwargs):
+        super().__init__(master, **kwargs)
+        self.info_font = info_font
+        self.button_font = button_font
+        self.text_for = text_for
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        self.items = []
+        self.first = 0
+        self.rows = []
+        self.row_height = None
+        self.viewport_height = 0
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        self.header_label = ctk.CTkLabel(self, text=label_text, font=label_font)
+        self.header_label.grid(row=0, column=0, columnspan=2, padx=5, pady=(5, 0), sticky="ew")
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=1, column=0, padx=(5, 0), pady=5, sticky="nsew")
+        self.body.grid_columnconfigure(0, weight=1)
+        self.body.grid_propagate(False)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, padx=(0, 5), pady=5, sticky="ns")
+        self.empty_label = ctk.CTkLabel(self.body, text="No goals added yet...", font=info_font)
+
+        self.body.bind("<Configure>", self._on_body_configure)
+        window = self.winfo_toplevel()
+        if sys.platform.startswith("linux"):
+            window.bind_all("<Button-4>", self._on_mouse_wheel, add=True)
+            window.bind_all("<Button-5>", self._on_mouse_wheel, add=True)
+        else:
+            window.bind_all("<MouseWheel>", self._on_mouse_wheel, add=True)
+
+    def set_items(self, items, empty_text="No goals added yet..."):
+        self.items = items
+        if self.empty_label.cget("text") != empty_text:
+            self.empty_label.configure(text=empty_text)
+        self._render()
+
+    def refresh(self):
+        self._render()
+
+    def remeasure(self):
+        self.row_height = None
+        self._layout()
+
+    def scroll_to(self, first):
+        first = max(0, min(first, self._max_first()))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def _add_row(self):
+        slot = len(self.rows)
+        item_frame = ctk.CTkFrame(self.body)
+        item_frame.grid(row=slot, column=0, padx=5, pady=(3, 4), sticky="ew")
+        item_frame.grid_columnconfigure(0, weight=1)
+        item_frame.grid_columnconfigure(1, weight=0)
+        item_frame.grid_columnconfigure(2, weight=0)
+        info_label = ctk.CTkLabel(item_frame, text="\n", justify="left", anchor="w", font=self.info_font)
+        info_label.grid(row=0, column=0, padx=10, pady=(5,5), sticky="ew")
+        edit_button = ctk.CTkButton(
+            item_frame, text="Edit", command=lambda s=slot: self._on_slot_action(s, self.on_edit),
+            width=50, font=self.button_font, fg_color="#3B8ED0", hover_color="#2F70A6"
+        )
+        edit_button.grid(row=0, column=1, padx=(5, 5), pady=5, sticky="e")
+        delete_button = ctk.CTkButton(
+            item_frame, text="Delete", command=lambda s=slot: self._on_slot_action(s, self.on_delete),
+            width=60, fg_color="#DB3E3E", hover_color="#A92F2F", font=self.button_font
+        )
+        delete_button.grid(row=0, column=2, padx=(0, 10), pady=5, sticky="e")
+        self.rows.append({
+            "frame": item_frame, "label": info_label, "edit_button": edit_button,
+            "delete_button": delete_button, "text": None, "shown": True,
+        })
+
+    def _layout(self):
+        if self.viewport_height <= 0:
+            return
+        if self.row_height is None:
+            if not self.rows:
+                self._add_row()
+            self.rows[0]["frame"].update_idletasks()
+            self.row_height = max(1, self.rows[0]["frame"].winfo_reqheight() + VIRTUAL_ROW_PADDING)
+        pool_size = self.viewport_height // self.row_height + 1
+        while len(self.rows) < pool_size:
+            self._add_row()
+        while len(self.rows) > pool_size:
+            self.rows.pop()["frame"].destroy()
+        self._render()
+
+    def _render(self):
+        if self.row_height is None:
+            return
+        self.first = max(0, min(self.first, self._max_first()))
+        for slot, row in enumerate(self.rows):
+            index = self.first + slot
+            if index < len(self.items):
+                text = self.text_for(self.items[index])
+                if row["text"] != text:
+                    row["label"].configure(text=text)
+                    row["text"] = text
+                if not row["shown"]:
+                    row["frame"].grid()
+                    row["shown"] = True
+            elif row["shown"]:
+                row["frame"].grid_remove()
+                row["shown"] = False
+
+        if self.items:
+            self.empty_label.grid_remove()
+            total = len(self.items)
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self._page_size()) / total))
         else:
-             time_str = ', '.join(parts)
-             return f"{time_str} ago", total_days
+            self.empty_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+            self.scrollbar.set(0.0, 1.0)
+
+    def _page_size(self):
+        if not self.row_height:
+            return 1
+        return max(1, self.viewport_height // self.row_height)
+
+    def _max_first(self):
+        return max(0, len(self.items) - self._page_size())
 
-    except ValueError:
-        return "Invalid Stored Date Format", None
-    except Exception as e:
-        print(f"Error calculating time for '{start_date_str}': {e}")
-        return "Error calculating time", None
+    def _on_slot_action(self, slot, callback):
+        index = self.first + slot
+        if index < len(self.items):
+            callback(self.items[index])
 
-def get_random_encouragement():
-    return random.choice(ENCOURAGING_WORDS)
+    def _on_body_configure(self, event):
+        if event.height != self.viewport_height:
+            self.viewport_height = event.height
+            self._layout()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(round(float(value) * len(self.items))))
+        else:
+            step = self._page_size() if unit == "pages" else 1
+            self.scroll_to(self.first + int(value) * step)
+
+    def _on_mouse_wheel(self, event):
+        widget_path, own_path = str(event.widget), str(self)
+        if widget_path != own_path and not widget_path.startswith(own_path + "."):
+            return
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.first - VIRTUAL_WHEEL_ROWS)
+        else:
+            self.scroll_to(self.first + VIRTUAL_WHEEL_ROWS)
 
 class GoalsApp(ctk.CTk):
     def __init__(self):
@@ -84,9 +203,42 @@ class GoalsApp(ctk.CTk):
         ctk.set_appearance_mode("System")
         ctk.set_default_color_theme("blue")
 
-        self.goals = []
+        self.goals = GoalIndex()
+        self.name_search = NameSearch(self.goals)
+        self.search_query = ""
+        self.search_matches = None
+        self.search_shown = None
+        self.store = None
+        self.persistence = None
+        self.closing = False
+        self.loading = False
+        self.load_failed = False
+        self.load_error_count = 0
+        self.load_queue = None
+        self.load_job = None
+        self.expected_goal_count = 0
+        self.goal_rows = {}
+        self.goal_row_order = []
+        self.no_goals_label = None
         self.status_clear_job = None
+        self.midnight_job = None
         self.current_font_size = DEFAULT_FONT_SIZE
+        self.list_mode = DEFAULT_LIST_MODE
+        self.storage_backend = DEFAULT_STORAGE_BACKEND
+        self.virtual_list = False
+        self.diagnostics_setting = False
+        self.diagnostics = None
+        self.diagnostics_window = None
+        self.diagnostics_text = None
+        self.diagnostics_job = None
+        self.load_started = 0.0
+
+        self.resize_job = None
+        self.edit_dialog = None
+        self.edit_goal = None
+        self.edit_name_entry = None
+        self.edit_date_picker = None
+        self.edit_status_label = None
 
         self.REGULAR_FONT = None
         self.INPUT_FONT = None
@@ -94,11 +246,21 @@ class GoalsApp(ctk.CTk):
         self.INFO_DISPLAY_FONT = None
         self.STATUS_FONT = None
         self.FRAME_LABEL_FONT = None
+        self.DATE_FONT = None
 
         self.load_settings()
-        self._update_font_tuples(self.current_font_size)
+        if diagnostics_requested(self.diagnostics_setting):
+            self._enable_diagnostics()
+        self._create_fonts(self.current_font_size)
 
         self.load_goals()
+        self.persistence = PersistenceWorker(
+            self.store, on_error=self._report_persistence_error, stats=self.diagnostics
+        )
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.virtual_list = self.list_mode == "virtual" or (
+            self.list_mode == "auto" and self.expected_goal_count > VIRTUAL_LIST_THRESHOLD
+        )
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=0)
@@ -118,10 +280,13 @@ class GoalsApp(ctk.CTk):
         self.label_date.grid(row=1, column=0, padx=(10, 5), pady=10, sticky="w")
         self.date_picker = DateEntry(
             self.input_frame, width=15, date_pattern=DATE_ENTRY_PATTERN,
-            font=self.INPUT_FONT, borderwidth=2,
+            font=self.DATE_FONT, borderwidth=2,
         )
         self.date_picker.grid(row=1, column=1, padx=5, pady=10, sticky="w")
-        self.add_button = ctk.CTkButton(self.input_frame, text="Add Goal", command=self.add_goal, font=self.BUTTON_FONT)
+        self.add_button = ctk.CTkButton(
+            self.input_frame, text="Add Goal", command=self.add_goal, font=self.BUTTON_FONT,
+            state="disabled" if self.loading else "normal",
+        )
         self.add_button.grid(row=0, column=2, rowspan=2, padx=(5, 10), pady=10, sticky="ns")
 
         self.settings_frame = ctk.CTkFrame(self)
@@ -136,56 +301,106 @@ class GoalsApp(ctk.CTk):
         )
         self.font_size_combobox.set(str(self.current_font_size))
         self.font_size_combobox.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        self.import_button = ctk.CTkButton(
+            self.settings_frame, text="Import...", command=self.import_goals, font=self.BUTTON_FONT, width=90
+        )
+        self.import_button.grid(row=0, column=2, padx=(20, 5), pady=5, sticky="w")
+        self.export_button = ctk.CTkButton(
+            self.settings_frame, text="Export...", command=self.export_goals, font=self.BUTTON_FONT, width=90
+        )
+        self.export_button.grid(row=0, column=3, padx=(5, 10), pady=5, sticky="w")
+        if self.diagnostics is not None:
+            self.diagnostics_button = ctk.CTkButton(
+                self.settings_frame, text="Diagnostics", command=self.open_diagnostics, font=self.BUTTON_FONT,
+                width=90, fg_color="gray", hover_color="darkgray",
+            )
+            self.diagnostics_button.grid(row=0, column=4, padx=(5, 10), pady=5, sticky="w")
+            self.bind("<F12>", lambda event: self.open_diagnostics())
         self.display_frame_container = ctk.CTkFrame(self)
         self.display_frame_container.grid(row=2, column=0, padx=20, pady=(0, 10), sticky="nsew")
-        self.display_frame_container.grid_rowconfigure(0, weight=1)
+        self.display_frame_container.grid_rowconfigure(0, weight=0)
+        self.display_frame_container.grid_rowconfigure(1, weight=1)
         self.display_frame_container.grid_columnconfigure(0, weight=1)
-        self.display_frame = ctk.CTkScrollableFrame(
-            self.display_frame_container, label_text="Your Goals (Sorted by Date)",
-            label_font=self.FRAME_LABEL_FONT
+        self.search_entry = ctk.CTkEntry(
+            self.display_frame_container, placeholder_text="Search goals...", font=self.INPUT_FONT
         )
-        self.display_frame.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
-        self.display_frame.grid_columnconfigure(0, weight=1)
+        self.search_entry.grid(row=0, column=0, padx=5, pady=(5, 0), sticky="ew")
+        self.search_entry.bind("<KeyRelease>", self._on_search_changed)
+        # Build the index before the first keystroke rather than on it.
+        self.search_entry.bind("<FocusIn>", lambda event: self.name_search.build())
+        self._create_display_frame()
         self.status_label = ctk.CTkLabel(self, text="", text_color="gray", font=self.STATUS_FONT)
         self.status_label.grid(row=3, column=0, padx=20, pady=(0, 10), sticky="ew")
         self.update_display()
         self._adjust_window_size() 
+        self._schedule_midnight_refresh()
+        if self.loading:
+            self.update_status("Loading goals...", "gray", persistent=True)
+
+    # "auto" starts with whichever list suits the stored goal count and
+    # switches to the virtual list once the goals outgrow the full one.
+    def _create_display_frame(self):
+        if self.virtual_list:
+            self.display_frame = VirtualGoalList(
+                self.display_frame_container, label_text="Your Goals (Sorted by Date)",
+                label_font=self.FRAME_LABEL_FONT, info_font=self.INFO_DISPLAY_FONT,
+                button_font=self.BUTTON_FONT, text_for=self._goal_info_text,
+                on_edit=lambda g: self.open_edit_dialog(self._goal_index(g)),
+                on_delete=lambda g: self.delete_goal(self._goal_index(g)),
+            )
+        else:
+            self.display_frame = ctk.CTkScrollableFrame(
+                self.display_frame_container, label_text="Your Goals (Sorted by Date)",
+                label_font=self.FRAME_LABEL_FONT
+            )
+        self.display_frame.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
+        self.display_frame.grid_columnconfigure(0, weight=1)
 
-    def _update_font_tuples(self, base_size):
-        info_size = base_size + 2
+    def _switch_to_virtual_list(self):
+        for row in self.goal_rows.values():
+            row["frame"].destroy()
+        self.goal_rows = {}
+        self.goal_row_order = []
+        self.no_goals_label = None
+        self.display_frame.destroy()
+        self.virtual_list = True
+        self._create_display_frame()
+
+    def _font_sizes(self, base_size):
         status_size = base_size - 2 if base_size > MIN_FONT_SIZE else MIN_FONT_SIZE
-        frame_label_size = base_size
-        self.REGULAR_FONT = ("", base_size)
-        self.INPUT_FONT = ("", base_size)
-        self.BUTTON_FONT = ("", base_size)
-        self.INFO_DISPLAY_FONT = ("", info_size)
-        self.STATUS_FONT = ("", status_size)
-        self.FRAME_LABEL_FONT = ("", frame_label_size, "bold")
+        return {
+            "REGULAR_FONT": base_size,
+            "INPUT_FONT": base_size,
+            "BUTTON_FONT": base_size,
+            "INFO_DISPLAY_FONT": base_size + 2,
+            "STATUS_FONT": status_size,
+            "FRAME_LABEL_FONT": base_size,
+            "DATE_FONT": base_size,
+        }
+
+    # DateEntry is a plain ttk widget, so it gets a Tk font sized in points
+    # like the CTk widgets around it rather than a CTkFont (sized in pixels).
+    def _create_fonts(self, base_size):
+        for role, size in self._font_sizes(base_size).items():
+            weight = "bold" if role == "FRAME_LABEL_FONT" else "normal"
+            font_class = tkfont.Font if role == "DATE_FONT" else ctk.CTkFont
+            setattr(self, role, font_class(family="", size=size, weight=weight))
 
     def load_settings(self):
-        try:
-            if os.path.exists(SETTINGS_FILE):
-                with open(SETTINGS_FILE, 'r') as f:
-                    settings_data = json.load(f)
-                    loaded_size = settings_data.get("font_size", DEFAULT_FONT_SIZE)
-                    if MIN_FONT_SIZE <= loaded_size <= MAX_FONT_SIZE:
-                         self.current_font_size = loaded_size
-                    else:
-                         self.current_font_size = DEFAULT_FONT_SIZE
-            else:
-                 self.current_font_size = DEFAULT_FONT_SIZE
-        except Exception as e:
-             print(f"Error loading settings: {e}. Using default.")
-             self.current_font_size = DEFAULT_FONT_SIZE
+        settings = read_settings()
+        self.current_font_size = settings["font_size"]
+        self.list_mode = settings["list_mode"]
+        self.storage_backend = settings["storage"]
+        self.diagnostics_setting = settings["diagnostics"]
 
     def save_settings(self):
-        settings_data = {"font_size": self.current_font_size}
-        try:
-            with open(SETTINGS_FILE, 'w') as f:
-                json.dump(settings_data, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
-            self.update_status(f"Error saving settings: {e}", "red")
+        settings_data = {
+            "font_size": self.current_font_size,
+            "list_mode": self.list_mode,
+            "storage": self.storage_backend,
+            "diagnostics": self.diagnostics_setting,
+        }
+        self.persistence.submit_settings(settings_data)
 
     def font_size_changed(self, selected_size_str):
         try:
@@ -193,8 +408,7 @@ class GoalsApp(ctk.CTk):
             if MIN_FONT_SIZE <= new_size <= MAX_FONT_SIZE:
                 if new_size != self.current_font_size:
                     self.current_font_size = new_size
-                    self._update_font_tuples(self.current_font_size)
-                    self._apply_global_font_settings() 
+                    self._apply_global_font_settings()
                     self.save_settings()
             else:
                  self.font_size_combobox.set(str(self.current_font_size))
@@ -202,20 +416,17 @@ class GoalsApp(ctk.CTk):
              self.font_size_combobox.set(str(self.current_font_size))
 
     def _apply_global_font_settings(self):
-        self.label_goal.configure(font=self.REGULAR_FONT)
-        self.entry_goal.configure(font=self.INPUT_FONT)
-        self.label_date.configure(font=self.REGULAR_FONT)
-        self.add_button.configure(font=self.BUTTON_FONT)
-        self.label_font_size.configure(font=self.REGULAR_FONT)
-        self.font_size_combobox.configure(font=self.INPUT_FONT)
-        self.status_label.configure(font=self.STATUS_FONT)
-        self.display_frame.configure(label_font=self.FRAME_LABEL_FONT)
-        try:
-            self.date_picker.configure(font=self.INPUT_FONT, date_pattern=DATE_ENTRY_PATTERN)
-        except Exception as e:
-            print(f"Note: Could not apply font/pattern to DatePicker: {e}")
+        # Widgets share the font objects, so resizing the fonts is enough for
+        # Tk to re-render them; layout is settled once, when the loop is idle.
+        for role, size in self._font_sizes(self.current_font_size).items():
+            getattr(self, role).configure(size=size)
+        if self.resize_job is None:
+            self.resize_job = self.after_idle(self._on_fonts_resized)
 
-        self.update_display()
+    def _on_fonts_resized(self):
+        self.resize_job = None
+        if self.virtual_list:
+            self.display_frame.remeasure()
         self._adjust_window_size()
 
     def _adjust_window_size(self):
@@ -231,94 +442,317 @@ class GoalsApp(ctk.CTk):
         self.geometry(f"{padded_width}x{padded_height}")
         print(f"Resized window to: {padded_width}x{padded_height} (Min Required: {req_width}x{req_height})") 
 
+    # Goals are parsed on a loader thread and queued in batches; the Tk loop
+    # drains the queue with after(), so the first screenful shows while the
+    # rest of the file is still being read. Changes are held off until the
+    # load finishes, and for the whole session if it fails partway, so nothing
+    # is written over goals not yet read.
     def load_goals(self):
-        load_error = False
-        if os.path.exists(DATA_FILE):
-            try:
-                with open(DATA_FILE, 'r') as f:
-                    self.goals = json.load(f)
-            except json.JSONDecodeError:
-                self.update_status(f"Warning: Could not read {DATA_FILE}. Starting fresh.", "orange", persistent=True)
-                self.goals = []
-                load_error = True
-            except Exception as e:
-                self.update_status(f"Error loading goals: {e}", "red", persistent=True)
-                self.goals = []
-                load_error = True
-        else:
-            self.goals = []
-        for goal in self.goals:
-            goal['_current_encouragement'] = get_random_encouragement()
-        if not load_error and not self.goals:
-             pass
-        elif not load_error:
-             pass
-
-    def save_goals(self):
+        self.load_started = time.perf_counter()
+        self.store = create_goal_store(self.storage_backend)
+        self.goals = GoalIndex()
+        self.loading = True
+        self.load_failed = False
+        self.load_error_count = 0
         try:
-            self.goals.sort(key=lambda x: x.get('date', '9999-12-31'))
-            with open(DATA_FILE, 'w') as f:
-                json.dump(self.goals, f, indent=4)
+            self.expected_goal_count = self.store.estimate_count()
         except Exception as e:
-            print(f"Error saving goals: {e}")
-            self.update_status(f"Error saving goals: {e}", "red", persistent=True)
+            print(f"Could not estimate goal count: {e}")
+            self.expected_goal_count = 0
+        self.name_search = NameSearch(self.goals)
+        self.load_queue = queue.Queue()
+        threading.Thread(
+            target=self._load_goals_worker, args=(self.store, self.load_queue), name="goals-loader", daemon=True
+        ).start()
+        self.load_job = self.after(LOAD_POLL_MS, self._drain_load_queue)
 
-    def update_display(self):
-        for widget in self.display_frame.winfo_children():
-            widget.destroy()
+    def _load_goals_worker(self, store, load_queue):
+        try:
+            for goals, errors in store.iter_load():
+                load_queue.put(("batch", goals, errors))
+                if self.closing:
+                    break
+        except Exception as e:
+            load_queue.put(("error", f"Error loading goals: {e}. Changes are turned off until it is fixed.", "red"))
+        load_queue.put(("done", None, None))
+
+    def _drain_load_queue(self):
+        self.load_job = None
+        first_batch = not self.goals
+        received = finished = False
+        while not finished:
+            try:
+                kind, payload, detail = self.load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "batch":
+                self._add_loaded_goals(payload, detail)
+                received = True
+            elif kind == "error":
+                self.load_failed = True
+                self.update_status(payload, detail, persistent=True)
+            else:
+                finished = True
+        if received:
+            self.update_display()
+            if first_batch and self.goals:
+                self._adjust_window_size()
+        if finished:
+            self._finish_loading()
+            return
+        if received and not self.load_failed:
+            self.update_status(f"Loading goals... {len(self.goals)} so far", "gray", persistent=True)
+        self.load_job = self.after(LOAD_POLL_MS, self._drain_load_queue)
 
+    def _add_loaded_goals(self, goals, errors):
+        errors = list(errors)
+        added = []
+        for goal in goals:
+            goal.encouragement = get_random_encouragement()
+            try:
+                self.goals.add(goal)
+            except ValueError as e:
+                errors.append(str(e))
+                continue
+            added.append(goal)
+        self.name_search.add_many(added)
+        for error in errors:
+            print(f"Skipped unreadable goal: {error}")
+        self.load_error_count += len(errors)
+
+    def _finish_loading(self):
+        self.loading = False
+        if self.diagnostics is not None:
+            # load_goals itself only starts the loader; this is the whole load.
+            self.diagnostics.record("load_goals (streamed)", time.perf_counter() - self.load_started)
+        if not self.load_failed:
+            self.add_button.configure(state="normal")
         if not self.goals:
-            no_goals_label = ctk.CTkLabel(self.display_frame, text="No goals added yet...", font=self.INFO_DISPLAY_FONT)
-            no_goals_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+            self.update_display()
+        else:
+            self._adjust_window_size()
+        if self.load_failed:
             return
+        if self.load_error_count:
+            self.update_status(
+                f"Warning: Skipped {self.load_error_count} unreadable goal record(s).", "orange", persistent=True
+            )
+        else:
+            self.update_status(f"Loaded {len(self.goals)} goal(s).", "gray")
 
-        try:
-            self.goals.sort(key=lambda x: date.fromisoformat(x.get('date', '9999-12-31')))
-        except ValueError:
-             self.update_status("Warning: Invalid date found during sorting.", "orange")
-             self.goals.sort(key=lambda x: x.get('date', '9999-12-31'))
+    def _changes_blocked(self):
+        if self.loading:
+            self.update_status("Please wait until your goals finish loading.", "orange")
+        elif self.load_failed:
+            self.update_status("Your goals could not be read in full, so changes are turned off.", "red")
+        return self.loading or self.load_failed
+
+    def save_goals(self, change):
+        self.persistence.submit_change(self.goals, change)
+
+    def _report_persistence_error(self, message):
+        # Runs on the writer thread; after() hands the message to the Tk loop.
+        print(message)
+        self.after(0, self.update_status, message, "red", True)
 
-        for index, goal in enumerate(self.goals):
-            goal_name = goal.get('name', 'Unnamed')
-            goal_date_str_iso = goal.get('date', 'No Date')
+    def _on_close(self):
+        if self.closing:
+            return
+        self.closing = True
+        if self.load_job:
+            self.after_cancel(self.load_job)
+            self.load_job = None
+        if self.midnight_job:
+            self.after_cancel(self.midnight_job)
+            self.midnight_job = None
+        # Keep servicing Tk while the writer finishes: it may be waiting on an
+        # after() call to report an error.
+        while not self.persistence.close(timeout=0.05):
+            self.update()
+        if self.diagnostics is not None:
+            if self.diagnostics_job:
+                self.after_cancel(self.diagnostics_job)
+                self.diagnostics_job = None
             try:
-                date_obj = date.fromisoformat(goal_date_str_iso)
-                display_date_str = date_obj.strftime(DISPLAY_DATE_FORMAT).upper() 
-            except ValueError:
-                display_date_str = goal_date_str_iso + " (invalid)"
+                self.diagnostics.dump(DIAGNOSTICS_FILE, goals=len(self.goals), widgets=self._count_widgets())
+                print(f"Diagnostics written to {DIAGNOSTICS_FILE}")
+            except OSError as e:
+                print(f"Error writing diagnostics: {e}")
+        self.destroy()
 
-            elapsed_str, _ = calculate_time_elapsed(goal_date_str_iso)
-            encouragement = goal.get('_current_encouragement', get_random_encouragement())
+    def update_display(self):
+        self.search_shown = None
+        if self.list_mode == "auto" and not self.virtual_list and len(self.goals) > VIRTUAL_LIST_THRESHOLD:
+            self._switch_to_virtual_list()
+        if self.search_query:
+            self.search_matches = self.name_search.search(self.search_query)
+        if self.virtual_list:
+            self._show_search_results()
+            return
 
-            item_frame = ctk.CTkFrame(self.display_frame)
-            item_frame.grid(row=index, column=0, padx=5, pady=(3, 4), sticky="ew")
-            item_frame.grid_columnconfigure(0, weight=1)
-            item_frame.grid_columnconfigure(1, weight=0)
-            item_frame.grid_columnconfigure(2, weight=0)
+        if not self.goals:
+            for key in list(self.goal_rows):
+                self.goal_rows.pop(key)["frame"].destroy()
+            self.goal_row_order = []
+            if self.no_goals_label is None:
+                self.no_goals_label = ctk.CTkLabel(self.display_frame, text="", font=self.INFO_DISPLAY_FONT)
+            self.no_goals_label.configure(text="Loading goals..." if self.loading else "No goals added yet...")
+            self.no_goals_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+            return
+        if self.no_goals_label is not None:
+            self.no_goals_label.grid_remove()
 
-            info_text = f"📌 {goal_name} (Since: {display_date_str})\n   └── {elapsed_str} - {encouragement}"
+        # Rows are keyed by goal identity: Goal objects are edited in place, and a
+        # row keeps its goal alive so the id cannot be reused while it exists.
+        order = [id(goal) for goal in self.goals]
+        live_keys = set(order)
+        for key in [key for key in self.goal_rows if key not in live_keys]:
+            self.goal_rows.pop(key)["frame"].destroy()
 
-            info_label = ctk.CTkLabel(item_frame, text=info_text, justify="left", anchor="w", font=self.INFO_DISPLAY_FONT)
-            info_label.grid(row=0, column=0, padx=10, pady=(5,5), sticky="ew")
+        totals, _, _ = elapsed_days_batch(self.goals.ordinals())
+        for goal, total_days in zip(self.goals, totals):
+            info_text = self._goal_info_text(goal, total_days)
+            row = self.goal_rows.get(id(goal))
+            if row is None:
+                self.goal_rows[id(goal)] = self._create_goal_row(goal, info_text)
+                continue
+            self._set_row_text(row, info_text)
 
-            edit_button = ctk.CTkButton(
-                item_frame, text="Edit", command=lambda i=index: self.open_edit_dialog(i),
-                width=50, font=self.BUTTON_FONT, fg_color="#3B8ED0", hover_color="#2F70A6"
-            )
-            edit_button.grid(row=0, column=1, padx=(5, 5), pady=5, sticky="e")
+        if order != self.goal_row_order:
+            for index, key in enumerate(order):
+                row = self.goal_rows[key]
+                if row["position"] != index:
+                    row["frame"].grid(row=index, column=0, padx=5, pady=(3, 4), sticky="ew")
+                    row["position"] = index
+                    row["hidden"] = False
+            self.goal_row_order = order
+        self._show_search_results()
 
-            delete_button = ctk.CTkButton(
-                item_frame, text="Delete", command=lambda i=index: self.delete_goal(i),
-                width=60, fg_color="#DB3E3E", hover_color="#A92F2F", font=self.BUTTON_FONT
-            )
-            delete_button.grid(row=0, column=2, padx=(0, 10), pady=5, sticky="e")
+    def _on_search_changed(self, event=None):
+        query = self.search_entry.get().strip()
+        if query == self.search_query:
+            return
+        # Typing more of the same query can only narrow it, so the goals shown
+        # for the old query are filtered instead of the whole list.
+        if not (self.search_query and query.startswith(self.search_query)):
+            self.search_shown = None
+        self.search_query = query
+        self.search_matches = self.name_search.search(query)
+        if self.goals:
+            self._show_search_results()
+
+    # Filtering never rebuilds rows: the virtual list is handed the matching
+    # goals in list order, and full-list rows are only grid_remove()d or re-gridded.
+    def _show_search_results(self):
+        matches = self.search_matches if self.search_query else None
+        if self.virtual_list:
+            if matches is None:
+                self.search_shown = None
+                self.display_frame.set_items(self.goals)
+            else:
+                candidates = self.goals if self.search_shown is None else self.search_shown
+                self.search_shown = [goal for goal in candidates if goal in matches]
+                self.display_frame.set_items(self.search_shown, empty_text="No goals match your search.")
+            return
+
+        shown = 0
+        for row in self.goal_rows.values():
+            hidden = matches is not None and row["goal"] not in matches
+            if hidden != row["hidden"]:
+                if hidden:
+                    row["frame"].grid_remove()
+                else:
+                    row["frame"].grid()
+                row["hidden"] = hidden
+            shown += not hidden
+        if shown:
+            if self.no_goals_label is not None:
+                self.no_goals_label.grid_remove()
+            return
+        if self.no_goals_label is None:
+            self.no_goals_label = ctk.CTkLabel(self.display_frame, text="", font=self.INFO_DISPLAY_FONT)
+        self.no_goals_label.configure(text="No goals match your search.")
+        self.no_goals_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+
+    def _set_row_text(self, row, info_text):
+        if row["text"] != info_text:
+            row["label"].configure(text=info_text)
+            row["text"] = info_text
+
+    def _schedule_midnight_refresh(self):
+        # Work from timestamps so the delay stays right across DST changes.
+        tomorrow = date.today() + timedelta(days=1)
+        next_midnight = time.mktime(datetime.combine(tomorrow, datetime.min.time()).timetuple())
+        delay_ms = max(0, int((next_midnight - time.time()) * 1000)) + MIDNIGHT_REFRESH_SLACK_MS
+        self.midnight_job = self.after(delay_ms, self._on_midnight)
+
+    def _on_midnight(self):
+        self.midnight_job = None
+        self.refresh_elapsed_labels()
+        self._schedule_midnight_refresh()
+
+    def refresh_elapsed_labels(self):
+        if self.virtual_list:
+            self.display_frame.refresh()
+            return
+        totals, _, _ = elapsed_days_batch(self.goals.ordinals())
+        for goal, total_days in zip(self.goals, totals):
+            row = self.goal_rows.get(id(goal))
+            if row is not None:
+                self._set_row_text(row, self._goal_info_text(goal, total_days))
+
+    def _goal_info_text(self, goal, total_days=None):
+        if total_days is None:
+            elapsed_str, _ = calculate_time_elapsed(goal.ordinal)
+        else:
+            elapsed_str = describe_elapsed(goal.ordinal, total_days)
+        if goal.encouragement is None:
+            goal.encouragement = get_random_encouragement()
+        if goal.history:
+            today = date.today().toordinal() if total_days is None else goal.ordinal + total_days
+            stats = goal.streak_stats(today)
+            elapsed_str += f" (best {stats['longest']} days, {stats['relapses']} relapse{'s' if stats['relapses'] != 1 else ''})"
+        return f"📌 {goal.name} (Since: {format_display_date(goal.ordinal)})\n   └── {elapsed_str} - {goal.encouragement}"
+
+    def _create_goal_row(self, goal, info_text):
+        item_frame = ctk.CTkFrame(self.display_frame)
+        item_frame.grid_columnconfigure(0, weight=1)
+        item_frame.grid_columnconfigure(1, weight=0)
+        item_frame.grid_columnconfigure(2, weight=0)
+
+        info_label = ctk.CTkLabel(item_frame, text=info_text, justify="left", anchor="w", font=self.INFO_DISPLAY_FONT)
+        info_label.grid(row=0, column=0, padx=10, pady=(5,5), sticky="ew")
+
+        edit_button = ctk.CTkButton(
+            item_frame, text="Edit", command=lambda g=goal: self.open_edit_dialog(self._goal_index(g)),
+            width=50, font=self.BUTTON_FONT, fg_color="#3B8ED0", hover_color="#2F70A6"
+        )
+        edit_button.grid(row=0, column=1, padx=(5, 5), pady=5, sticky="e")
 
+        delete_button = ctk.CTkButton(
+            item_frame, text="Delete", command=lambda g=goal: self.delete_goal(self._goal_index(g)),
+            width=60, fg_color="#DB3E3E", hover_color="#A92F2F", font=self.BUTTON_FONT
+        )
+        delete_button.grid(row=0, column=2, padx=(0, 10), pady=5, sticky="e")
+
+        return {
+            "goal": goal, "frame": item_frame, "label": info_label,
+            "edit_button": edit_button, "delete_button": delete_button,
+            "text": info_text, "position": None, "hidden": False,
+        }
+
+    def _goal_index(self, goal):
+        try:
+            return self.goals.index(goal)
+        except ValueError:
+            return -1
 
     def add_goal(self):
+        if self._changes_blocked():
+            return
         goal_name = self.entry_goal.get().strip()
         try:
             goal_date_obj = self.date_picker.get_date()
-            goal_date_str_iso = goal_date_obj.isoformat()
         except Exception as e:
              print(f"Error getting date from picker: {e}")
              self.update_status("Could not get date from picker.", "red")
@@ -327,17 +761,16 @@ class GoalsApp(ctk.CTk):
             self.update_status("Goal name cannot be empty.", "orange")
             self.entry_goal.focus_set()
             return
-        for existing_goal in self.goals:
-            if existing_goal.get('name', '').lower() == goal_name.lower():
-                 self.update_status(f"Goal '{goal_name}' already exists.", "orange")
-                 return
+        if self.goals.find(goal_name) is not None:
+             self.update_status(f"Goal '{goal_name}' already exists.", "orange")
+             return
 #        if len(self.goals) >= MAX_GOALS:
 #            self.update_status(f"Cannot add more than {MAX_GOALS} goals.", "orange")
 #            return
-        new_goal = {"name": goal_name, "date": goal_date_str_iso}
-        new_goal['_current_encouragement'] = get_random_encouragement()
-        self.goals.append(new_goal)
-        self.save_goals()
+        new_goal = Goal(goal_name, goal_date_obj.toordinal(), get_random_encouragement())
+        self.goals.add(new_goal)
+        self.name_search.add(new_goal)
+        self.save_goals({"op": "add", **new_goal.to_dict()})
         self.update_display()
         self.entry_goal.delete(0, ctk.END)
         self.date_picker.set_date(date.today())
@@ -345,20 +778,69 @@ class GoalsApp(ctk.CTk):
         self.update_status(f"Goal '{goal_name}' added successfully!", "green")
 
     def delete_goal(self, index):
-        goal_to_delete = self.goals[index].get('name', 'this goal')
+        if self._changes_blocked():
+            return
+        if not (0 <= index < len(self.goals)):
+            self.update_status("Error: Could not delete goal (invalid index).", "red")
+            return
+        goal_to_delete = self.goals[index].name
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete the goal '{goal_to_delete}'?"):
             if 0 <= index < len(self.goals):
                 try:
                     removed_goal = self.goals.pop(index)
-                    self.save_goals()
+                    self.name_search.remove(removed_goal)
+                    self.save_goals({"op": "delete", "name": removed_goal.name})
                     self.update_display()
-                    self.update_status(f"Goal '{removed_goal.get('name', 'Unknown')}' deleted.", "#A9A9A9")
+                    self.update_status(f"Goal '{removed_goal.name}' deleted.", "#A9A9A9")
                 except Exception as e:
                     self.update_status(f"Error deleting goal: {e}", "red")
                     self.update_display()
             else:
                 self.update_status("Error: Could not delete goal (invalid index).", "red")
 
+    # The whole file is validated before anything changes, then the new goals
+    # go in with one merge, one journal write and one display refresh.
+    def import_goals(self):
+        if self._changes_blocked():
+            return
+        path = filedialog.askopenfilename(parent=self, title="Import Goals", filetypes=GOAL_FILE_TYPES)
+        if not path:
+            return
+        try:
+            new_goals, errors = read_goal_file(path, self.goals)
+        except (OSError, ValueError) as e:
+            self.update_status(f"Could not import goals: {e}", "red", persistent=True)
+            return
+        for error in errors:
+            print(f"Skipped: {error}")
+        if new_goals:
+            for goal in new_goals:
+                goal.encouragement = get_random_encouragement()
+            self.goals.extend(new_goals)
+            self.name_search.add_many(new_goals)
+            self.persistence.submit_changes(self.goals, [{"op": "add", **goal.to_dict()} for goal in new_goals])
+            self.update_display()
+        message = f"Imported {len(new_goals)} goal(s)."
+        if errors:
+            self.update_status(f"{message} Skipped {len(errors)} record(s).", "orange", persistent=True)
+        else:
+            self.update_status(message, "green")
+
+    def export_goals(self):
+        if self._changes_blocked():
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Export Goals", defaultextension=".csv", filetypes=GOAL_FILE_TYPES
+        )
+        if not path:
+            return
+        try:
+            write_goal_file(path, self.goals)
+        except (OSError, ValueError) as e:
+            self.update_status(f"Could not export goals: {e}", "red", persistent=True)
+            return
+        self.update_status(f"Exported {len(self.goals)} goal(s).", "green")
+
     def update_status(self, message, color="gray", persistent=False):
         self.status_label.configure(text=message, text_color=color)
         if self.status_clear_job:
@@ -371,60 +853,85 @@ class GoalsApp(ctk.CTk):
             )
 
     def open_edit_dialog(self, index):
+        if self._changes_blocked():
+            return
         if not (0 <= index < len(self.goals)):
             self.update_status("Error: Cannot edit goal (invalid index).", "red")
             return
+        if self.edit_dialog is None:
+            self._build_edit_dialog()
         goal_data = self.goals[index]
-        original_name = goal_data.get('name', '')
-        original_date_str_iso = goal_data.get('date', '')
+        self.edit_goal = goal_data
+        self.edit_name_entry.delete(0, ctk.END)
+        self.edit_name_entry.insert(0, goal_data.name)
+        self.edit_date_picker.set_date(date.fromordinal(goal_data.ordinal))
+        self.edit_status_label.configure(text="", text_color="orange")
+        self.edit_dialog.deiconify()
+        self.edit_dialog.lift()
+        self.edit_dialog.grab_set()
+        self.edit_name_entry.focus_set()
+
+    # The dialog is built on first use and then only hidden and re-shown, so
+    # opening the editor never pays for a new Toplevel or DateEntry.
+    def _build_edit_dialog(self):
         edit_dialog = ctk.CTkToplevel(self)
         edit_dialog.title("Edit Goal")
         edit_dialog.transient(self)
-        edit_dialog.grab_set()
-        edit_dialog.geometry("400x250") 
+        edit_dialog.geometry("520x250") 
+        edit_dialog.protocol("WM_DELETE_WINDOW", self._hide_edit_dialog)
         dialog_frame = ctk.CTkFrame(edit_dialog)
         dialog_frame.pack(expand=True, fill="both", padx=20, pady=20)
         name_label = ctk.CTkLabel(dialog_frame, text="Goal Name:", font=self.REGULAR_FONT)
         name_label.grid(row=0, column=0, padx=5, pady=(5, 5), sticky="w")
         name_entry = ctk.CTkEntry(dialog_frame, font=self.INPUT_FONT, width=250)
-        name_entry.insert(0, original_name)
         name_entry.grid(row=0, column=1, padx=5, pady=(5, 5), sticky="ew")
         date_label = ctk.CTkLabel(dialog_frame, text="Start/Quit Date:", font=self.REGULAR_FONT)
         date_label.grid(row=1, column=0, padx=5, pady=5, sticky="w")
-        try:
-            initial_date = date.fromisoformat(original_date_str_iso)
-        except ValueError:
-            print(f"Warning: Invalid date format '{original_date_str_iso}' for goal '{original_name}'. Defaulting.")
-            initial_date = date.today()
         edit_date_picker = DateEntry(
             dialog_frame, width=15, date_pattern=DATE_ENTRY_PATTERN, 
-            font=self.INPUT_FONT, borderwidth=2,
+            font=self.DATE_FONT, borderwidth=2,
         )
-        edit_date_picker.set_date(initial_date)
         edit_date_picker.grid(row=1, column=1, padx=5, pady=5, sticky="w")
         dialog_status_label = ctk.CTkLabel(dialog_frame, text="", font=self.STATUS_FONT, text_color="orange")
         dialog_status_label.grid(row=2, column=0, columnspan=2, padx=5, pady=(10, 0), sticky="ew")
         button_frame = ctk.CTkFrame(dialog_frame, fg_color="transparent")
         button_frame.grid(row=3, column=0, columnspan=2, pady=(20, 5))
         save_button = ctk.CTkButton(
-            button_frame, text="Save Changes", font=self.BUTTON_FONT,
-            command=lambda: self.save_edit(index, name_entry, edit_date_picker, edit_dialog, dialog_status_label)
+            button_frame, text="Save Changes", font=self.BUTTON_FONT, command=self.save_edit
         )
         save_button.pack(side="left", padx=10)
+        relapse_button = ctk.CTkButton(
+            button_frame, text="Log Relapse", font=self.BUTTON_FONT, fg_color="#C0392B", hover_color="#922B21",
+            command=self.log_relapse
+        )
+        relapse_button.pack(side="left", padx=10)
         cancel_button = ctk.CTkButton(
             button_frame, text="Cancel", font=self.BUTTON_FONT, fg_color="gray", hover_color="darkgray",
-            command=edit_dialog.destroy
+            command=self._hide_edit_dialog
         )
         cancel_button.pack(side="right", padx=10)
-        name_entry.focus_set()
         edit_dialog.bind("<Return>", lambda event: save_button.invoke())
-        edit_dialog.bind("<Escape>", lambda event: edit_dialog.destroy())
+        edit_dialog.bind("<Escape>", lambda event: self._hide_edit_dialog())
+
+        self.edit_dialog = edit_dialog
+        self.edit_name_entry = name_entry
+        self.edit_date_picker = edit_date_picker
+        self.edit_status_label = dialog_status_label
+
+    def _hide_edit_dialog(self):
+        self.edit_goal = None
+        self.edit_dialog.grab_release()
+        self.edit_dialog.withdraw()
 
-    def save_edit(self, index, name_widget, date_widget, dialog, status_widget):
-        new_name = name_widget.get().strip()
+    def save_edit(self):
+        goal = self.edit_goal
+        if goal is None or self._goal_index(goal) < 0:
+            self._hide_edit_dialog()
+            return
+        status_widget = self.edit_status_label
+        new_name = self.edit_name_entry.get().strip()
         try:
-            new_date_obj = date_widget.get_date()
-            new_date_str_iso = new_date_obj.isoformat() 
+            new_date_obj = self.edit_date_picker.get_date()
         except Exception as e:
             print(f"Error getting date from edit picker: {e}")
             status_widget.configure(text="Error getting date.", text_color="red")
@@ -432,22 +939,111 @@ class GoalsApp(ctk.CTk):
         if not new_name:
             status_widget.configure(text="Goal name cannot be empty.")
             return
-        for i, goal in enumerate(self.goals):
-            if i != index and goal.get('name', '').lower() == new_name.lower():
-                status_widget.configure(text=f"Another goal named '{new_name}' already exists.")
-                return
         try:
-            self.goals[index]['name'] = new_name
-            self.goals[index]['date'] = new_date_str_iso
-            self.save_goals()
+            goal.check_start(new_date_obj.toordinal())
+        except ValueError as e:
+            status_widget.configure(text=f"The {e}.")
+            return
+        old_name = goal.name
+        if self.goals.find(new_name) not in (None, goal):
+            status_widget.configure(text=f"Another goal named '{new_name}' already exists.")
+            return
+        try:
+            self.goals.rename(goal, new_name)
+            if new_name != old_name:
+                self.name_search.rename(goal, old_name)
+            self.goals.redate(goal, new_date_obj.toordinal())
+            self.save_goals({"op": "edit", "old": old_name, **goal.to_dict()})
             self.update_display()
             self.update_status(f"Goal '{new_name}' updated successfully.", "green")
-            dialog.destroy()
+            self._hide_edit_dialog()
         except Exception as e:
             print(f"Error saving edited goal: {e}")
             status_widget.configure(text=f"Error saving changes: {e}", text_color="red")
-            self.update_status(f"Error saving changes for goal index {index}.", "red")
+            self.update_status(f"Error saving changes for goal '{old_name}'.", "red")
 
-if __name__ == "__main__":
+    # A relapse closes the current streak on the picked date and starts a new
+    # one there; the old streak is kept in the goal's history.
+    def log_relapse(self):
+        goal = self.edit_goal
+        if goal is None or self._goal_index(goal) < 0:
+            self._hide_edit_dialog()
+            return
+        status_widget = self.edit_status_label
+        try:
+            relapse_ordinal = self.edit_date_picker.get_date().toordinal()
+        except Exception as e:
+            print(f"Error getting date from edit picker: {e}")
+            status_widget.configure(text="Error getting date.", text_color="red")
+            return
+        if relapse_ordinal < goal.ordinal:
+            status_widget.configure(text="Pick a relapse date on or after the current start date.")
+            return
+        if not messagebox.askyesno(
+            "Log Relapse", f"Log a relapse for '{goal.name}' on {format_display_date(relapse_ordinal)}?", parent=self.edit_dialog
+        ):
+            return
+        self.goals.relapse(goal, relapse_ordinal)
+        self.save_goals({"op": "edit", "old": goal.name, **goal.to_dict()})
+        self.update_display()
+        self.update_status(f"Relapse logged for '{goal.name}'. Back at it - you've got this!", "orange")
+        self._hide_edit_dialog()
+
+    # Timed stand-ins are set on the instance, shadowing the class methods, so
+    # nothing wraps these hot paths unless diagnostics are switched on.
+    def _enable_diagnostics(self):
+        self.diagnostics = CallStats(count_widgets=self._count_widgets)
+        for name in INSTRUMENTED_METHODS:
+            setattr(self, name, self.diagnostics.wrap(name, getattr(self, name)))
+
+    def _count_widgets(self):
+        count = 0
+        pending = [self]
+        while pending:
+            children = pending.pop().winfo_children()
+            count += len(children)
+            pending.extend(children)
+        return count
+
+    def open_diagnostics(self):
+        if self.diagnostics_window is None:
+            window = ctk.CTkToplevel(self)
+            window.title("Diagnostics")
+            window.geometry("720x260")
+            window.protocol("WM_DELETE_WINDOW", self._hide_diagnostics)
+            self.diagnostics_text = ctk.CTkTextbox(window, font=ctk.CTkFont(family="Courier", size=MIN_FONT_SIZE), wrap="none")
+            self.diagnostics_text.pack(expand=True, fill="both", padx=10, pady=10)
+            self.diagnostics_window = window
+        self.diagnostics_window.deiconify()
+        self.diagnostics_window.lift()
+        self._refresh_diagnostics()
+
+    def _hide_diagnostics(self):
+        if self.diagnostics_job:
+            self.after_cancel(self.diagnostics_job)
+            self.diagnostics_job = None
+        self.diagnostics_window.withdraw()
+
+    def _refresh_diagnostics(self):
+        self.diagnostics_job = None
+        lines = [f"{'':<30}{'calls':>7}{'total ms':>11}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}{'widgets':>9}"]
+        for name, stats in self.diagnostics.snapshot().items():
+            widgets = "" if stats["widgets"] is None else stats["widgets"]
+            lines.append(
+                f"{name:<30}{stats['calls']:>7}{stats['total_ms']:>11.1f}{stats['mean_ms']:>10.2f}"
+                f"{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}{widgets:>9}"
+            )
+        lines.append("")
+        lines.append(f"Goals: {len(self.goals)}    Widgets now: {self._count_widgets()}")
+        self.diagnostics_text.configure(state="normal")
+        self.diagnostics_text.delete("1.0", "end")
+        self.diagnostics_text.insert("1.0", "\n".join(lines))
+        self.diagnostics_text.configure(state="disabled")
+        self.diagnostics_job = self.after(DIAGNOSTICS_REFRESH_MS, self._refresh_diagnostics)
+
+def main():
     app = GoalsApp()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,222 @@
+# Command-line access to your goals. Only goals_core is imported up front, so
+# none of these commands start Tk; the window is imported on demand by "gui".
+#
+#   python goals_cli.py list
+#   python goals_cli.py add "Quit caffeine" --date 2025-04-01
+#   python goals_cli.py edit "Quit caffeine" --name "No coffee" --date 2025-04-02
+#   python goals_cli.py delete "No coffee"
+#   python goals_cli.py relapse "No coffee" --date 2025-06-10
+#   python goals_cli.py report --json
+#   python goals_cli.py import habits.csv
+#   python goals_cli.py export goals.jsonl
+#   python goals_cli.py gui
+
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import date
+
+from goals_core import (
+    GOAL_FILE_FORMATS, Goal, GoalIndex, create_goal_store, describe_elapsed, elapsed_days_batch,
+    read_goal_file, read_settings, write_goal_file,
+)
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value).toordinal()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}' (expected YYYY-MM-DD)")
+
+def fail(message):
+    print(message, file=sys.stderr)
+    return 1
+
+def cmd_list(store, goals, args):
+    if not goals:
+        print("No goals added yet...")
+        return 0
+    totals, _, _ = elapsed_days_batch(goals.ordinals())
+    for goal, total_days in zip(goals, totals):
+        print(f"{goal.iso_date}  {goal.name}  ({describe_elapsed(goal.ordinal, total_days)})")
+    return 0
+
+def cmd_add(store, goals, args):
+    name = args.name.strip()
+    if not name:
+        return fail("Goal name cannot be empty.")
+    if goals.find(name) is not None:
+        return fail(f"Goal '{name}' already exists.")
+    goal = Goal(name, args.date)
+    goals.add(goal)
+    store.save(goals, {"op": "add", **goal.to_dict()})
+    print(f"Goal '{name}' added.")
+    return 0
+
+def cmd_edit(store, goals, args):
+    goal = goals.find(args.goal)
+    if goal is None:
+        return fail(f"No goal named '{args.goal}'.")
+    new_name = args.name.strip() if args.name is not None else goal.name
+    if not new_name:
+        return fail("Goal name cannot be empty.")
+    if goals.find(new_name) not in (None, goal):
+        return fail(f"Another goal named '{new_name}' already exists.")
+    if args.date is not None:
+        try:
+            goal.check_start(args.date)
+        except ValueError as e:
+            return fail(f"The {e}.")
+    old_name = goal.name
+    goals.rename(goal, new_name)
+    if args.date is not None:
+        goals.redate(goal, args.date)
+    store.save(goals, {"op": "edit", "old": old_name, **goal.to_dict()})
+    print(f"Goal '{new_name}' updated.")
+    return 0
+
+def cmd_delete(store, goals, args):
+    goal = goals.find(args.goal)
+    if goal is None:
+        return fail(f"No goal named '{args.goal}'.")
+    goals.remove(goal)
+    store.save(goals, {"op": "delete", "name": goal.name})
+    print(f"Goal '{goal.name}' deleted.")
+    return 0
+
+def cmd_relapse(store, goals, args):
+    goal = goals.find(args.goal)
+    if goal is None:
+        return fail(f"No goal named '{args.goal}'.")
+    if args.date < goal.ordinal:
+        return fail(f"Relapse date must be on or after {goal.iso_date}.")
+    goals.relapse(goal, args.date)
+    store.save(goals, {"op": "edit", "old": goal.name, **goal.to_dict()})
+    stats = goal.streak_stats()
+    print(f"Relapse logged for '{goal.name}'. Longest streak so far: {stats['longest']} days.")
+    return 0
+
+def cmd_report(store, goals, args):
+    totals, years, remaining_days = elapsed_days_batch(goals.ordinals())
+    today = date.today().toordinal()
+    report = []
+    for goal, total_days, goal_years, goal_days in zip(goals, totals, years, remaining_days):
+        stats = goal.streak_stats(today)
+        report.append({
+            "name": goal.name,
+            "date": goal.iso_date,
+            "days": total_days,
+            "years": goal_years,
+            "remaining_days": goal_days,
+            "elapsed": describe_elapsed(goal.ordinal, total_days),
+            "longest_streak": stats["longest"],
+            "average_streak": round(stats["average"], 1),
+            "total_clean_days": stats["total"],
+            "relapses": stats["relapses"],
+        })
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    if not report:
+        print("No goals added yet...")
+        return 0
+    longest = max(report, key=lambda entry: entry["days"])
+    best = max(report, key=lambda entry: entry["longest_streak"])
+    print(f"Goals tracked: {len(report)}")
+    print(f"Longest streak: {longest['name']} ({longest['elapsed']})")
+    print(f"Best streak ever: {best['name']} ({best['longest_streak']} days)")
+    print(f"Total days clean: {sum(entry['total_clean_days'] for entry in report)}")
+    print(f"Relapses logged: {sum(entry['relapses'] for entry in report)}")
+    return 0
+
+def cmd_import(store, goals, args):
+    try:
+        new_goals, errors = read_goal_file(args.file, goals, args.format)
+    except (OSError, ValueError) as e:
+        return fail(f"Could not import {args.file}: {e}")
+    for error in errors:
+        print(f"Skipped: {error}", file=sys.stderr)
+    if new_goals:
+        goals.extend(new_goals)
+        store.save_changes(goals, [{"op": "add", **goal.to_dict()} for goal in new_goals])
+    print(f"Imported {len(new_goals)} goal(s).")
+    return 0
+
+def cmd_export(store, goals, args):
+    try:
+        write_goal_file(args.file, goals, args.format)
+    except (OSError, ValueError) as e:
+        return fail(f"Could not export to {args.file}: {e}")
+    print(f"Exported {len(goals)} goal(s) to {args.file}.")
+    return 0
+
+def cmd_gui(args):
+    import goals_app
+    goals_app.main()
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="goals", description="Keep track of your goals from the command line.")
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("list", help="list goals by start date").set_defaults(func=cmd_list)
+
+    add_parser = commands.add_parser("add", help="add a goal")
+    add_parser.add_argument("name")
+    add_parser.add_argument("--date", type=parse_date, default=date.today().toordinal(),
+                            help="start/quit date as YYYY-MM-DD (default: today)")
+    add_parser.set_defaults(func=cmd_add)
+
+    edit_parser = commands.add_parser("edit", help="rename a goal or change its date")
+    edit_parser.add_argument("goal", help="current goal name")
+    edit_parser.add_argument("--name", help="new goal name")
+    edit_parser.add_argument("--date", type=parse_date, help="new start/quit date as YYYY-MM-DD")
+    edit_parser.set_defaults(func=cmd_edit)
+
+    delete_parser = commands.add_parser("delete", help="delete a goal")
+    delete_parser.add_argument("goal", help="goal name")
+    delete_parser.set_defaults(func=cmd_delete)
+
+    relapse_parser = commands.add_parser("relapse", help="log a relapse and start a new streak")
+    relapse_parser.add_argument("goal", help="goal name")
+    relapse_parser.add_argument("--date", type=parse_date, default=date.today().toordinal(),
+                                help="relapse date as YYYY-MM-DD (default: today)")
+    relapse_parser.set_defaults(func=cmd_relapse)
+
+    report_parser = commands.add_parser("report", help="summarize streaks")
+    report_parser.add_argument("--json", action="store_true", help="print one JSON record per goal")
+    report_parser.set_defaults(func=cmd_report)
+
+    import_parser = commands.add_parser("import", help="add goals from a CSV or JSON Lines file")
+    import_parser.add_argument("file", help="file with name and date (YYYY-MM-DD) per goal")
+    import_parser.add_argument("--format", choices=GOAL_FILE_FORMATS, help="file format (default: from the extension)")
+    import_parser.set_defaults(func=cmd_import)
+
+    export_parser = commands.add_parser("export", help="write all goals to a CSV or JSON Lines file")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--format", choices=GOAL_FILE_FORMATS, help="file format (default: from the extension)")
+    export_parser.set_defaults(func=cmd_export)
+
+    commands.add_parser("gui", help="open the window (default)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command in (None, "gui"):
+        return cmd_gui(args)
+
+    store = create_goal_store(read_settings()["storage"])
+    try:
+        try:
+            goals = GoalIndex(store.load())
+        except (OSError, ValueError, sqlite3.Error) as e:
+            return fail(f"Could not read goals: {e}")
+        for error in store.load_errors:
+            print(f"Skipped unreadable goal: {error}", file=sys.stderr)
+        return args.func(store, goals, args)
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1141 @@
+# Headless goals model and persistence: the Goal record, the date-ordered
+# GoalIndex, the journal and SQLite stores, elapsed-time maths and settings.
+# Nothing here imports Tk, so the CLI can use it without paying for a window.
+
+from array import array
+import bisect
+from collections import deque
+import csv
+import functools
+import json
+import math
+import os
+from datetime import date
+import operator
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+# MAX_GOALS = 10
+DATA_FILE = "goals_data.json"
+SETTINGS_FILE = "settings.json"
+JOURNAL_FILE = "goals_data.journal"
+JOURNAL_COMPACT_BYTES = 256 * 1024
+SQLITE_FILE = "goals_data.sqlite3"
+SQLITE_SCHEMA_VERSION = 2
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    date TEXT NOT NULL,
+    history BLOB
+);
+CREATE UNIQUE INDEX IF NOT EXISTS goals_name_key ON goals (name_key);
+CREATE INDEX IF NOT EXISTS goals_date ON goals (date);
+"""
+GOAL_FILE_FORMATS = ("csv", "jsonl")
+GOAL_FILE_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+STORAGE_BACKENDS = ("json", "sqlite")
+DEFAULT_STORAGE_BACKEND = "json"
+
+ENCOURAGING_WORDS = [
+    "You've got this!", "Keep going strong!", "Amazing progress!", "One day at a time!",
+    "You're doing great!", "Stay focused!", "Incredible work!", "Persistence pays off!",
+    "Keep pushing forward!", "Celebrate this milestone!", "Look how far you've come!",
+    "Keep up the momentum!", "Fantastic effort!", "You're inspiring!",
+    "Badass milestone!", "Kick that habit's ass!", "QUIET! Silence the weakness!",
+    "No mercy on cravings!", "Fear does not exist in this dojo!", "Defeat does not exist!",
+    "Get your head out of your ass and keep fighting!", "Stop being a pussy, you got this!",
+    "Man up and crush this!", "You're becoming a badass!", "Strike hard against temptation!",
+    "Don't let weakness sweep the leg!", "Finish it! Stay strong!",
+    "This shit ain't easy, but you're doing it!", "Awesome!", "Be a badass today!", "No fear!",
+]
+
+DEFAULT_FONT_SIZE = 16
+MIN_FONT_SIZE = 12
+MAX_FONT_SIZE = 24
+DISPLAY_DATE_FORMAT = "%d %b %Y"
+LIST_MODES = ("auto", "virtual", "full")
+DEFAULT_LIST_MODE = "auto"
+NUMPY_BATCH_THRESHOLD = 1024
+PERSIST_DEBOUNCE_SECONDS = 0.3
+LOAD_FIRST_BATCH_SIZE = 50
+LOAD_BATCH_SIZE = 1000
+STREAM_CHUNK_SIZE = 64 * 1024
+ESTIMATED_RECORD_BYTES = 48
+NAME_WORD_PATTERN = re.compile(r"\w+")
+DIAGNOSTICS_ENV = "GOALS_DIAGNOSTICS"
+DIAGNOSTICS_FILE = "goals_diagnostics.json"
+DIAGNOSTICS_SAMPLES = 1000
+
+def calculate_time_elapsed(start_ordinal, today_ordinal=None):
+    if today_ordinal is None:
+        today_ordinal = date.today().toordinal()
+    total_days = today_ordinal - start_ordinal
+    return describe_elapsed(start_ordinal, total_days), total_days
+
+# NumPy is optional and only imported the first time a batch is large enough
+# to benefit, so short lists and CLI start-up never pay for it.
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+# Day counts for many goals at once: one vectorized subtraction and divmod when
+# NumPy is available, a plain loop otherwise. Returns (total_days, years,
+# remaining_days) as lists, in the order of the given ordinals.
+def elapsed_days_batch(ordinals, today_ordinal=None):
+    if today_ordinal is None:
+        today_ordinal = date.today().toordinal()
+    np = _numpy() if len(ordinals) >= NUMPY_BATCH_THRESHOLD else None
+    if np is not None:
+        totals = today_ordinal - np.asarray(ordinals, dtype=np.int64)
+        years, remaining_days = np.divmod(totals, 365)
+        return totals.tolist(), years.tolist(), remaining_days.tolist()
+    totals = [today_ordinal - ordinal for ordinal in ordinals]
+    return totals, [total // 365 for total in totals], [total % 365 for total in totals]
+
+def describe_elapsed(start_ordinal, total_days):
+    if total_days < 0:
+        return f"Date {date.fromordinal(start_ordinal).isoformat()} is in the future."
+    return format_elapsed(total_days)
+
+# Many goals share a day count, so the phrase is built once per count.
+@functools.lru_cache(maxsize=8192)
+def format_elapsed(total_days):
+    years = total_days // 365
+    remaining_days = total_days % 365
+    days = remaining_days
+
+    parts = []
+    if years > 0:
+        parts.append(f"{years} year{'s' if years > 1 else ''}")
+    if days > 0 or total_days == 0:
+         parts.append(f"{days} day{'s' if days != 1 else ''}")
+
+    if total_days == 0:
+         return "Today is the day!"
+    elif not parts:
+         return f"{total_days} day{'s' if total_days != 1 else ''} ago"
+    else:
+         time_str = ', '.join(parts)
+         return f"{time_str} ago"
+
+@functools.lru_cache(maxsize=4096)
+def format_display_date(ordinal):
+    return date.fromordinal(ordinal).strftime(DISPLAY_DATE_FORMAT).upper()
+
+def get_random_encouragement():
+    return random.choice(ENCOURAGING_WORDS)
+
+
+# One tracked goal. The start date is held as a proleptic Gregorian ordinal,
+# parsed once when the goal is loaded. encouragement is session-only and is
+# not part of the persisted payload.
+#
+# history holds the start ordinals of earlier streaks, oldest first; each one
+# ended where the next began and the last ended at ordinal. Only the longest
+# closed streak needs caching: total clean days telescope to today minus the
+# first start, so every figure in streak_stats is O(1).
+class Goal:
+    __slots__ = ("name", "ordinal", "encouragement", "history", "_longest_closed")
+
+    def __init__(self, name, ordinal, encouragement=None, history=None):
+        self.name = name
+        self.ordinal = ordinal
+        self.encouragement = encouragement
+        self._set_history(array('i') if history is None else history)
+
+    @classmethod
+    def from_dict(cls, data):
+        name = data.get('name')
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("missing goal name")
+        try:
+            history = array('i', data.get('history', ()))
+        except OverflowError:
+            raise ValueError("relapse history holds an invalid date")
+        return cls(name, date.fromisoformat(data.get('date', '')).toordinal(), history=history)
+
+    def to_dict(self):
+        if self.history:
+            return {"name": self.name, "date": self.iso_date, "history": self.history.tolist()}
+        return {"name": self.name, "date": self.iso_date}
+
+    def _set_history(self, history):
+        longest = 0
+        if history:
+            if history[0] < 1:
+                raise ValueError("relapse history holds an invalid date")
+            if history[-1] > self.ordinal:
+                raise ValueError("relapse history runs past the current start date")
+            for previous, start in zip(history, history[1:]):
+                if start < previous:
+                    raise ValueError("relapse history is out of order")
+                longest = max(longest, start - previous)
+        self.history = history
+        self._longest_closed = longest
+
+    def check_start(self, ordinal):
+        if self.history and ordinal < self.history[-1]:
+            raise ValueError(f"start date can't be before the previous streak ({date.fromordinal(self.history[-1]).isoformat()})")
+
+    def record_relapse(self, ordinal):
+        # Use GoalIndex.relapse for indexed goals; this moves the start date.
+        if ordinal < self.ordinal:
+            raise ValueError("relapse date is before the current streak started")
+        if self.history:
+            self._longest_closed = max(self._longest_closed, self.ordinal - self.history[-1])
+        self.history.append(self.ordinal)
+        self.ordinal = ordinal
+
+    def streak_stats(self, today_ordinal=None):
+        if today_ordinal is None:
+            today_ordinal = date.today().toordinal()
+        current = max(0, today_ordinal - self.ordinal)
+        longest = current
+        first = self.ordinal
+        if self.history:
+            longest = max(longest, self._longest_closed, self.ordinal - self.history[-1])
+            first = self.history[0]
+        total = max(0, today_ordinal - first)
+        return {
+            "current": current,
+            "longest": longest,
+            "average": total / (len(self.history) + 1),
+            "total": total,
+            "relapses": len(self.history),
+        }
+
+    @property
+    def iso_date(self):
+        return date.fromordinal(self.ordinal).isoformat()
+
+    @property
+    def name_key(self):
+        return self.name.lower()
+
+    def __repr__(self):
+        return f"Goal({self.name!r}, {self.iso_date!r})"
+
+
+def _skip_json_value(text, start):
+    # Index of the ',' or ']' ending the array element at start, or None if the
+    # element runs past the end of text. Only used when raw_decode has failed.
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '[{':
+            depth += 1
+        elif ch in ']}':
+            if depth == 0:
+                return i
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            return i
+    return None
+
+def iter_json_array(f, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield (position, element) for a top-level JSON array read in chunks.
+
+    A malformed element is yielded as (position, ValueError) and parsing
+    resumes at the next element. A file that is not an array raises.
+    """
+    decoder = json.JSONDecoder()
+    text, pos, eof = "", 0, False
+
+    def skip_space():
+        nonlocal text, pos, eof
+        while True:
+            while pos < len(text) and text[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(text) or eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            text, pos = chunk, 0
+
+    skip_space()
+    if text[pos:pos + 1] != '[':
+        raise json.JSONDecodeError("Expected a JSON array of goals", text, pos)
+    pos += 1
+    position = 0
+    while True:
+        skip_space()
+        if pos >= len(text):
+            if position:
+                yield position + 1, ValueError("file ends inside the goal list")
+            return
+        if text[pos] == ']':
+            return
+        if position and text[pos] == ',':
+            pos += 1
+            skip_space()
+        position += 1
+        while True:
+            try:
+                element, end = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as e:
+                end = _skip_json_value(text, pos)
+                if end is None and not eof:
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    text, pos = text[pos:] + chunk, 0
+                    continue
+                yield position, ValueError(f"invalid JSON: {e.msg}")
+                if end is None:
+                    return
+                pos = max(end, pos + 1)
+                break
+            if end == len(text) and not eof:
+                # A number may continue in the next chunk; re-read it whole.
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                text, pos = text[pos:] + chunk, 0
+                continue
+            pos = end
+            yield position, element
+            break
+
+
+# Date-ordered goal collection with a case-folded name map. Order is kept by
+# bisecting a parallel list of date ordinals, so changes never need a full
+# sort and duplicate lookups are a single dict hit.
+class GoalIndex:
+    def __init__(self, goals=()):
+        self._goals = sorted(goals, key=operator.attrgetter('ordinal'))
+        self._keys = [goal.ordinal for goal in self._goals]
+        self._by_name = {goal.name_key: goal for goal in self._goals}
+
+    def __len__(self):
+        return len(self._goals)
+
+    def __iter__(self):
+        return iter(self._goals)
+
+    def __getitem__(self, index):
+        return self._goals[index]
+
+    def find(self, name):
+        return self._by_name.get(name.lower())
+
+    def ordinals(self):
+        return self._keys
+
+    def index(self, goal):
+        position = bisect.bisect_left(self._keys, goal.ordinal)
+        while position < len(self._keys) and self._keys[position] == goal.ordinal:
+            if self._goals[position] is goal:
+                return position
+            position += 1
+        raise ValueError(f"Goal '{goal.name}' is not in the index")
+
+    def add(self, goal):
+        if goal.name_key in self._by_name:
+            raise ValueError(f"Goal '{goal.name}' already exists")
+        self._insert(goal)
+        self._by_name[goal.name_key] = goal
+
+    def extend(self, goals):
+        # One stable sort for a whole batch instead of an insert per goal.
+        goals = list(goals)
+        by_name = {}
+        for goal in goals:
+            if goal.name_key in self._by_name or goal.name_key in by_name:
+                raise ValueError(f"Goal '{goal.name}' already exists")
+            by_name[goal.name_key] = goal
+        self._goals.extend(goals)
+        self._goals.sort(key=operator.attrgetter('ordinal'))
+        self._keys = [goal.ordinal for goal in self._goals]
+        self._by_name.update(by_name)
+
+    def pop(self, index):
+        goal = self._goals.pop(index)
+        del self._keys[index]
+        if self._by_name.get(goal.name_key) is goal:
+            del self._by_name[goal.name_key]
+        return goal
+
+    def remove(self, goal):
+        self.pop(self.index(goal))
+
+    def rename(self, goal, new_name):
+        old_key, new_key = goal.name_key, new_name.lower()
+        if new_key != old_key and new_key in self._by_name:
+            raise ValueError(f"Goal '{new_name}' already exists")
+        if self._by_name.get(old_key) is goal:
+            del self._by_name[old_key]
+        goal.name = new_name
+        self._by_name[new_key] = goal
+
+    def redate(self, goal, new_ordinal):
+        if goal.ordinal == new_ordinal:
+            return
+        goal.check_start(new_ordinal)
+        position = self.index(goal)
+        del self._goals[position]
+        del self._keys[position]
+        goal.ordinal = new_ordinal
+        self._insert(goal)
+
+    def relapse(self, goal, ordinal):
+        position = self.index(goal)
+        goal.record_relapse(ordinal)
+        del self._goals[position]
+        del self._keys[position]
+        self._insert(goal)
+
+    def _insert(self, goal):
+        position = bisect.bisect_right(self._keys, goal.ordinal)
+        self._keys.insert(position, goal.ordinal)
+        self._goals.insert(position, goal)
+
+
+def name_words(text):
+    return NAME_WORD_PATTERN.findall(text.casefold())
+
+
+# Word-prefix index over goal names. Each case-folded word maps to the set of
+# goals whose name contains it (goals hash by identity, so a match is a cheap
+# membership test), and the distinct words are kept sorted so all words
+# starting with a prefix are one bisect range. One-letter queries, the widest
+# ranges, are answered from a per-initial set instead. It is built from goals on the
+# first search (or an explicit build()) and kept current by add/remove/rename
+# after that, so nothing is paid until somebody searches.
+class NameSearch:
+    def __init__(self, goals):
+        self.goals = goals
+        self._goals_by_word = None
+        self._goals_by_initial = None
+        self._words = None
+
+    def build(self):
+        if self._goals_by_word is not None:
+            return
+        self._goals_by_word = {}
+        self._goals_by_initial = {}
+        self._index(self.goals)
+
+    def _index(self, goals):
+        goals_by_word = self._goals_by_word
+        goals_by_initial = self._goals_by_initial
+        new_words = []
+        for goal in goals:
+            for word in name_words(goal.name):
+                word_goals = goals_by_word.get(word)
+                if word_goals is None:
+                    word_goals = goals_by_word[word] = set()
+                    new_words.append(word)
+                word_goals.add(goal)
+                goals_by_initial.setdefault(word[0], set()).add(goal)
+        if self._words is None:
+            self._words = sorted(new_words)
+        elif len(new_words) == 1:
+            bisect.insort(self._words, new_words[0])
+        elif new_words:
+            self._words.extend(new_words)
+            self._words.sort()
+
+    def add(self, goal):
+        self.add_many((goal,))
+
+    def add_many(self, goals):
+        if self._goals_by_word is not None:
+            self._index(goals)
+
+    def remove(self, goal, name=None):
+        # name is the goal's indexed name when it has already been renamed.
+        if self._goals_by_word is None:
+            return
+        for word in set(name_words(goal.name if name is None else name)):
+            initial_goals = self._goals_by_initial.get(word[0])
+            if initial_goals is not None:
+                initial_goals.discard(goal)
+            word_goals = self._goals_by_word.get(word)
+            if word_goals is None:
+                continue
+            word_goals.discard(goal)
+            if not word_goals:
+                del self._goals_by_word[word]
+                del self._words[bisect.bisect_left(self._words, word)]
+
+    def rename(self, goal, old_name):
+        self.remove(goal, old_name)
+        self.add(goal)
+
+    def search(self, query):
+        """Return the set of goals with a word starting with each query word, or None for a blank query."""
+        query_words = name_words(query)
+        if not query_words:
+            return None
+        self.build()
+        matches = None
+        # Longest word first: it usually has the narrowest range.
+        for prefix in sorted(set(query_words), key=len, reverse=True):
+            if len(prefix) == 1:
+                found = self._goals_by_initial.get(prefix, set())
+                matches = set(found) if matches is None else matches & found
+                if not matches:
+                    break
+                continue
+            start = bisect.bisect_left(self._words, prefix)
+            end = bisect.bisect_left(self._words, prefix + "\U0010ffff", start)
+            found = set().union(*(self._goals_by_word[word] for word in self._words[start:end]))
+            matches = found if matches is None else matches & found
+            if not matches:
+                break
+        return matches
+
+
+# Append-only change log kept next to the goals snapshot. Every mutation is
+# one compact JSON line; load replays the log over the snapshot and, once the
+# log grows past compact_bytes, the snapshot is rewritten atomically and the
+# log is dropped. Replay is idempotent, so a crash between replacing the
+# snapshot and removing the log only replays changes that are already in it.
+# Snapshot records skipped as unreadable are copied, as JSON Lines, to a
+# .skipped file beside the snapshot before a compaction leaves them out.
+class GoalJournal:
+    def __init__(self, data_file=DATA_FILE, journal_file=JOURNAL_FILE, compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.data_file = data_file
+        self.journal_file = journal_file
+        self.compact_bytes = compact_bytes
+        self.load_errors = []
+        self._skipped = []
+
+    def load(self):
+        goals = []
+        for batch, _ in self.iter_load():
+            goals.extend(batch)
+        goals.sort(key=operator.attrgetter('ordinal'))
+        return goals
+
+    def estimate_count(self):
+        try:
+            return os.path.getsize(self.data_file) // ESTIMATED_RECORD_BYTES
+        except OSError:
+            return 0
+
+    def iter_load(self, batch_size=LOAD_BATCH_SIZE, first_batch_size=LOAD_FIRST_BATCH_SIZE):
+        """Yield (goals, errors) batches while streaming the snapshot.
+
+        The journal is small, so it is replayed first into an overlay keyed by
+        the snapshot name each change started from; snapshot records are then
+        swapped for their journalled state as they stream past. The first batch
+        is kept short so a window can show something straight away.
+        """
+        self.load_errors = []
+        self._skipped = []
+        live, by_origin = self._replay_journal()
+        loaded = []
+        batch, errors = [], list(self.load_errors)
+        size = first_batch_size
+        for position, record in self._iter_snapshot():
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                goal = Goal.from_dict(record)
+            except (AttributeError, TypeError, ValueError) as e:
+                if position is None:
+                    error = f"{self.data_file}: {e}"
+                else:
+                    error = f"{self.data_file} record {position}: {e}"
+                    self._skipped.append(record)
+                self.load_errors.append(error)
+                errors.append(error)
+                continue
+            entry = by_origin.get(goal.name_key)
+            if entry is not None:
+                if entry["goal"] is None or entry["emitted"]:
+                    continue
+                entry["emitted"] = True
+                goal = entry["goal"]
+            elif goal.name_key in live:
+                # Already journalled under this name; that version wins.
+                continue
+            batch.append(goal)
+            if len(batch) >= size:
+                loaded.extend(batch)
+                yield batch, errors
+                batch, errors = [], []
+                size = batch_size
+        batch.extend(entry["goal"] for entry in live.values() if not entry["emitted"])
+        loaded.extend(batch)
+        yield batch, errors
+        if self.needs_compaction():
+            loaded.sort(key=operator.attrgetter('ordinal'))
+            self.compact(loaded)
+
+    def _iter_snapshot(self):
+        if not os.path.exists(self.data_file):
+            return
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            records = iter_json_array(f)
+            try:
+                first = next(records, None)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                unreadable = e
+            else:
+                if first is not None:
+                    yield first
+                    yield from records
+                return
+        # Not a goal list at all. Move it aside so the journal still replays
+        # and the next compaction cannot write over the only copy.
+        bad_file = self._unused_name(self.data_file + ".bad")
+        os.replace(self.data_file, bad_file)
+        print(f"Could not read {self.data_file} ({unreadable}); moved it to {bad_file}")
+        yield None, ValueError(f"unreadable ({unreadable}), moved to {bad_file}")
+
+    def _unused_name(self, path):
+        candidate, number = path, 1
+        while os.path.exists(candidate):
+            candidate = f"{path}.{number}"
+            number += 1
+        return candidate
+
+    def _replay_journal(self):
+        live, by_origin = {}, {}
+        if not os.path.exists(self.journal_file):
+            return live, by_origin
+
+        with open(self.journal_file, 'rb') as f:
+            data = f.read()
+        lines = data.split(b"\n")
+        torn_tail = lines.pop()
+        if torn_tail:
+            # A write was cut short; drop it so later appends start on a clean line.
+            print(f"Discarding incomplete journal entry in {self.journal_file}")
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(len(data) - len(torn_tail))
+        for line_number, line in enumerate(lines, start=1):
+            try:
+                self._replay(live, by_origin, json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, ValueError) as e:
+                self.load_errors.append(f"{self.journal_file} line {line_number}: {e}")
+        return live, by_origin
+
+    def _replay(self, live, by_origin, record):
+        # live maps current name keys to entries; by_origin maps the snapshot
+        # name an entry replaces. A name that is deleted or renamed away gets
+        # a tombstone (goal None) in by_origin, so a snapshot record under it
+        # stays hidden even when the snapshot was written after these changes.
+        op = record.get('op')
+        if op == 'add':
+            goal = Goal.from_dict(record)
+            entry = live.get(goal.name_key)
+            if entry is None:
+                entry = by_origin[goal.name_key] = {"goal": goal, "emitted": False}
+            entry["goal"] = goal
+            live[goal.name_key] = entry
+        elif op == 'edit':
+            edited = Goal.from_dict(record)
+            old_key = record['old'].lower()
+            entry = live.pop(old_key, None)
+            if entry is None:
+                entry = by_origin[old_key] = {"goal": None, "emitted": False}
+            if edited.name_key != old_key:
+                by_origin.setdefault(old_key, {"goal": None, "emitted": False})
+                replaced = live.pop(edited.name_key, None)
+                if replaced is not None:
+                    replaced["goal"] = None
+            entry["goal"] = edited
+            live[edited.name_key] = entry
+        elif op == 'delete':
+            key = record['name'].lower()
+            entry = live.pop(key, None)
+            if entry is not None:
+                entry["goal"] = None
+            by_origin.setdefault(key, {"goal": None, "emitted": False})
+        else:
+            raise ValueError(f"unknown journal operation {op!r}")
+
+    def save(self, goals, change=None):
+        if change is None:
+            self.compact(goals)
+        else:
+            self.save_changes(goals, [change])
+
+    def save_changes(self, goals, changes):
+        self.append(*changes)
+        if self.needs_compaction():
+            self.compact(goals)
+
+    def close(self):
+        pass
+
+    def append(self, *records):
+        lines = "".join(json.dumps(record, separators=(',', ':')) + "\n" for record in records)
+        with open(self.journal_file, 'a') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def needs_compaction(self):
+        try:
+            return os.path.getsize(self.journal_file) >= self.compact_bytes
+        except OSError:
+            return False
+
+    def compact(self, goals):
+        if self._skipped:
+            skipped_file = self._unused_name(self.data_file + ".skipped")
+            with open(skipped_file, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in self._skipped)
+                f.flush()
+                os.fsync(f.fileno())
+            print(f"Kept {len(self._skipped)} unreadable goal record(s) from {self.data_file} in {skipped_file}")
+            self._skipped = []
+        temp_file = self.data_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump([goal.to_dict() for goal in goals], f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.data_file)
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+
+# Optional SQLite backend. The start-date index serves ordered listing and the
+# unique index on the case-folded name keeps names distinct on disk.
+# Each save is one transaction, however many changes it carries.
+class SqliteGoalStore:
+    def __init__(self, db_file=SQLITE_FILE, import_file=DATA_FILE, import_journal=JOURNAL_FILE):
+        self.db_file = db_file
+        self.import_file = import_file
+        self.import_journal = import_journal
+        self.conn = None
+        self.load_errors = []
+
+    def _connection(self):
+        if self.conn is None:
+            # Writes may come from the PersistenceWorker thread after loading here.
+            self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self.conn.executescript(SQLITE_SCHEMA)
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version == 1:
+                self.conn.execute("ALTER TABLE goals ADD COLUMN history BLOB")
+            elif version == 0:
+                imported = self.import_json(GoalJournal(self.import_file, self.import_journal))
+                if imported:
+                    print(f"Imported {imported} goals from {self.import_file} into {self.db_file}")
+            if version != SQLITE_SCHEMA_VERSION:
+                self.conn.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+        return self.conn
+
+    def import_json(self, journal):
+        goals = journal.load()
+        conn = self._connection()
+        with conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO goals (name, name_key, date, history) VALUES (?, ?, ?, ?)",
+                ((goal.name, goal.name_key, goal.iso_date, _history_blob(goal.history)) for goal in goals),
+            )
+        return cursor.rowcount
+
+    def load(self):
+        goals = []
+        for batch, _ in self.iter_load():
+            goals.extend(batch)
+        return goals
+
+    def estimate_count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM goals").fetchone()[0]
+
+    def iter_load(self, batch_size=LOAD_BATCH_SIZE, first_batch_size=LOAD_FIRST_BATCH_SIZE):
+        self.load_errors = []
+        cursor = self._connection().execute("SELECT name, date, history FROM goals ORDER BY date, id")
+        position = 0
+        size = first_batch_size
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            goals, errors = [], []
+            for name, goal_date, history in rows:
+                position += 1
+                try:
+                    goal = Goal.from_dict({"name": name, "date": goal_date})
+                    if history:
+                        goal._set_history(_history_array(history))
+                    goals.append(goal)
+                except (AttributeError, TypeError, ValueError) as e:
+                    errors.append(f"{self.db_file} row {position}: {e}")
+            self.load_errors.extend(errors)
+            yield goals, errors
+            size = batch_size
+
+    def save(self, goals, change=None):
+        conn = self._connection()
+        with conn:
+            if change is None:
+                conn.execute("DELETE FROM goals")
+                conn.executemany(
+                    "INSERT INTO goals (name, name_key, date, history) VALUES (?, ?, ?, ?)",
+                    ((goal.name, goal.name_key, goal.iso_date, _history_blob(goal.history)) for goal in goals),
+                )
+            else:
+                self._apply(conn, change)
+
+    def save_changes(self, goals, changes):
+        conn = self._connection()
+        with conn:
+            for change in changes:
+                self._apply(conn, change)
+
+    def _apply(self, conn, change):
+        history = _history_blob(array('i', change.get('history', ())))
+        if change['op'] == 'add':
+            conn.execute(
+                "INSERT INTO goals (name, name_key, date, history) VALUES (?, ?, ?, ?)",
+                (change['name'], change['name'].lower(), change['date'], history),
+            )
+        elif change['op'] == 'edit':
+            conn.execute(
+                "UPDATE goals SET name = ?, name_key = ?, date = ?, history = ? WHERE name_key = ?",
+                (change['name'], change['name'].lower(), change['date'], history, change['old'].lower()),
+            )
+        elif change['op'] == 'delete':
+            conn.execute("DELETE FROM goals WHERE name_key = ?", (change['name'].lower(),))
+        else:
+            raise ValueError(f"Unknown goal change: {change['op']!r}")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def goal_file_format(path, fmt=None):
+    if fmt is None:
+        fmt = GOAL_FILE_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt not in GOAL_FILE_FORMATS:
+        raise ValueError(f"Unknown goal file format for {path} (use .csv or .jsonl)")
+    return fmt
+
+def iter_goal_file(f, fmt):
+    # Yields (line_number, record); a line that cannot be parsed comes through
+    # as (line_number, ValueError) so one bad line never sinks the rest.
+    # History is exchanged as ISO dates: a JSON list, or in CSV an optional
+    # history column joined by ';'. Both are turned into ordinals here.
+    if fmt == "csv":
+        reader = csv.DictReader(f, skipinitialspace=True)
+        if not {"name", "date"} <= set(reader.fieldnames or ()):
+            raise ValueError("CSV needs a header row with 'name' and 'date' columns")
+        try:
+            for record in reader:
+                history = record.pop("history", None) or ""
+                yield reader.line_num, _parse_history(record, history.split(";"))
+        except csv.Error as e:
+            raise ValueError(f"line {reader.line_num}: {e}")
+        return
+    for line_number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"invalid JSON: {e.msg}")
+            continue
+        if isinstance(record, dict) and isinstance(record.get("history"), list):
+            record = _parse_history(record, record.pop("history"))
+        yield line_number, record
+
+def read_goal_file(path, goals, fmt=None):
+    """Parse a CSV or JSON Lines file of goals to add to goals.
+
+    Returns (new_goals, errors). Records are validated as they stream in and
+    names are checked against goals and each other with one set; nothing is
+    changed, so the caller can commit the batch with a single save.
+    """
+    fmt = goal_file_format(path, fmt)
+    new_goals, errors = [], []
+    seen = set()
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for line_number, record in iter_goal_file(f, fmt):
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if not isinstance(record, dict):
+                    raise ValueError("expected an object with name and date")
+                goal = Goal.from_dict(record)
+            except (TypeError, ValueError) as e:
+                errors.append(f"{path} line {line_number}: {e}")
+                continue
+            goal.name = goal.name.strip()
+            if goal.name_key in seen or goals.find(goal.name) is not None:
+                errors.append(f"{path} line {line_number}: goal '{goal.name}' already exists")
+                continue
+            seen.add(goal.name_key)
+            new_goals.append(goal)
+    return new_goals, errors
+
+def write_goal_file(path, goals, fmt=None):
+    fmt = goal_file_format(path, fmt)
+    temp_file = path + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8', newline='') as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(["name", "date", "history"])
+            writer.writerows((goal.name, goal.iso_date, ";".join(_iso_history(goal))) for goal in goals)
+        else:
+            f.writelines(json.dumps(_exported_dict(goal), ensure_ascii=False) + "\n" for goal in goals)
+    os.replace(temp_file, path)
+
+
+def _parse_history(record, days):
+    # Ordinals are still accepted from JSON Lines files exported before
+    # history was written as dates.
+    try:
+        record["history"] = [
+            day if isinstance(day, int) else date.fromisoformat(day.strip()).toordinal()
+            for day in days if not isinstance(day, str) or day.strip()
+        ]
+    except (AttributeError, TypeError, ValueError):
+        return ValueError("relapse history holds an invalid date")
+    return record
+
+def _iso_history(goal):
+    return [date.fromordinal(start).isoformat() for start in goal.history]
+
+def _exported_dict(goal):
+    record = goal.to_dict()
+    if goal.history:
+        record["history"] = _iso_history(goal)
+    return record
+
+def _history_blob(history):
+    # Fixed little-endian int32s, so a database file moves between machines.
+    if not history:
+        return None
+    if sys.byteorder == "little":
+        return history.tobytes()
+    swapped = array('i', history)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+def _history_array(blob):
+    history = array('i')
+    history.frombytes(blob)
+    if sys.byteorder != "little":
+        history.byteswap()
+    return history
+
+def create_goal_store(backend):
+    if backend == "sqlite":
+        return SqliteGoalStore()
+    return GoalJournal()
+
+
+def read_settings(settings_file=SETTINGS_FILE):
+    settings = {
+        "font_size": DEFAULT_FONT_SIZE, "list_mode": DEFAULT_LIST_MODE, "storage": DEFAULT_STORAGE_BACKEND,
+        "diagnostics": False,
+    }
+    try:
+        if os.path.exists(settings_file):
+            with open(settings_file, 'r') as f:
+                settings_data = json.load(f)
+            loaded_size = settings_data.get("font_size", DEFAULT_FONT_SIZE)
+            if isinstance(loaded_size, int) and MIN_FONT_SIZE <= loaded_size <= MAX_FONT_SIZE:
+                settings["font_size"] = loaded_size
+            if settings_data.get("list_mode") in LIST_MODES:
+                settings["list_mode"] = settings_data["list_mode"]
+            if settings_data.get("storage") in STORAGE_BACKENDS:
+                settings["storage"] = settings_data["storage"]
+            if isinstance(settings_data.get("diagnostics"), bool):
+                settings["diagnostics"] = settings_data["diagnostics"]
+    except Exception as e:
+        print(f"Error loading settings: {e}. Using default.")
+    return settings
+
+def write_settings(settings, settings_file=SETTINGS_FILE):
+    temp_file = settings_file + ".tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(settings, f, indent=4)
+    os.replace(temp_file, settings_file)
+
+
+def diagnostics_requested(setting=False):
+    # The environment variable wins over the setting either way.
+    value = os.environ.get(DIAGNOSTICS_ENV, "").strip().lower()
+    if value:
+        return value not in ("0", "false", "no", "off")
+    return setting
+
+
+# Call counts and timings for named hot paths. wrap() returns a timed stand-in
+# for a function, so instrumentation is only ever installed when diagnostics
+# are on and costs nothing otherwise. The last DIAGNOSTICS_SAMPLES durations
+# are kept per name for the p95. count_widgets, when given, is sampled after
+# each call made on the main thread; record() may also be called from the
+# persistence writer, so updates and snapshots share a lock.
+class CallStats:
+    def __init__(self, count_widgets=None, samples=DIAGNOSTICS_SAMPLES):
+        self.count_widgets = count_widgets
+        self.samples = samples
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, name):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = {
+                    "calls": 0, "total": 0.0, "max": 0.0, "durations": deque(maxlen=self.samples), "widgets": None,
+                }
+            return stats
+
+    def wrap(self, name, func):
+        stats = self._entry(name)
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._add(stats, time.perf_counter() - start)
+        return timed
+
+    def record(self, name, seconds):
+        self._add(self._entry(name), seconds)
+
+    def _add(self, stats, seconds):
+        widgets = None
+        if self.count_widgets is not None and threading.current_thread() is threading.main_thread():
+            widgets = self.count_widgets()
+        with self._lock:
+            stats["calls"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["durations"].append(seconds)
+            if widgets is not None:
+                stats["widgets"] = widgets
+
+    def snapshot(self):
+        with self._lock:
+            entries = [(name, dict(stats, durations=sorted(stats["durations"])))
+                       for name, stats in self._stats.items()]
+        report = {}
+        for name, stats in entries:
+            durations = stats["durations"]
+            p95 = durations[max(0, math.ceil(len(durations) * 0.95) - 1)] if durations else 0.0
+            report[name] = {
+                "calls": stats["calls"],
+                "total_ms": round(stats["total"] * 1000, 3),
+                "mean_ms": round(stats["total"] * 1000 / stats["calls"], 3) if stats["calls"] else 0.0,
+                "p95_ms": round(p95 * 1000, 3),
+                "max_ms": round(stats["max"] * 1000, 3),
+                "widgets": stats["widgets"],
+            }
+        return report
+
+    def dump(self, path=DIAGNOSTICS_FILE, **extra):
+        temp_file = path + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump({**extra, "calls": self.snapshot()}, f, indent=4)
+        os.replace(temp_file, path)
+
+
+# Writes goal changes and settings on a background thread so a slow disk never
+# blocks the caller. Submissions inside the debounce window are coalesced: goal
+# changes are written in order as one batch and only the newest settings are
+# kept. Errors are passed to on_error on the writer thread. When stats (a
+# CallStats) is given, each goal write is timed as "save_goals (write)".
+class PersistenceWorker:
+    def __init__(self, store, on_error=print, debounce=PERSIST_DEBOUNCE_SECONDS, settings_file=SETTINGS_FILE,
+                 stats=None):
+        self.store = store
+        self.on_error = on_error
+        self.stats = stats
+        self.debounce = debounce
+        self.settings_file = settings_file
+        self._cond = threading.Condition()
+        self._changes = []
+        self._goals = None
+        self._settings = None
+        self._last_submit = 0.0
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="goals-writer", daemon=True)
+        self._thread.start()
+
+    def submit_change(self, goals, change):
+        # Copy the list now; the caller keeps mutating it while we write.
+        with self._cond:
+            self._changes.append(change)
+            self._goals = list(goals)
+            self._touch()
+
+    def submit_changes(self, goals, changes):
+        with self._cond:
+            self._changes.extend(changes)
+            self._goals = list(goals)
+            self._touch()
+
+    def submit_settings(self, settings):
+        with self._cond:
+            self._settings = dict(settings)
+            self._touch()
+
+    def close(self, timeout=None):
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return False
+        self.store.close()
+        return True
+
+    def _touch(self):
+        self._last_submit = time.monotonic()
+        self._cond.notify_all()
+
+    def _has_pending(self):
+        return bool(self._changes) or self._settings is not None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._has_pending() or self._closing)
+                if not self._has_pending():
+                    return
+                while not self._closing:
+                    remaining = self._last_submit + self.debounce - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                changes, goals, settings = self._changes, self._goals, self._settings
+                self._changes, self._goals, self._settings = [], None, None
+            self._write(changes, goals, settings)
+
+    def _write(self, changes, goals, settings):
+        if changes:
+            start = time.perf_counter()
+            try:
+                self.store.save_changes(goals, changes)
+            except Exception as e:
+                self.on_error(f"Error saving goals: {e}")
+            if self.stats is not None:
+                self.stats.record("save_goals (write)", time.perf_counter() - start)
+        if settings is not None:
+            try:
+                write_settings(settings, self.settings_file)
+            except Exception as e:
+                self.on_error(f"Error saving settings: {e}")